@@ -0,0 +1,114 @@
+import io
+import json
+import time
+from typing import Dict, List, Tuple, Type
+
+from pydantic import BaseModel
+
+from bug_agent import BugReport, _bug_agent
+from code_review import CodeReview, _reviewer
+from llm_client import get_openai_llm
+
+# Batch API (/v1/batches): half the price of synchronous requests, results within 24h
+COMPLETION_WINDOW = "24h"
+POLL_INITIAL_DELAY = 5.0
+POLL_MAX_DELAY = 60.0
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+_ROLES = {"system": "system", "human": "user", "ai": "assistant"}
+
+
+def _request_body(model: str, messages, schema: Type[BaseModel]) -> dict:
+    return {
+        "model": model,
+        "temperature": 0,
+        "messages": [{"role": _ROLES.get(m.type, "user"), "content": m.content} for m in messages],
+        "response_format": {
+            "type": "json_schema",
+            "json_schema": {"name": schema.__name__, "schema": schema.model_json_schema()}
+        }
+    }
+
+
+def _build_requests(files: Dict[str, str]) -> List[dict]:
+    """One review and one bug-analysis request per file, keyed by custom_id"""
+    reviewer, bug_agent = _reviewer(), _bug_agent()
+    model = reviewer.llm.model_name
+    requests = []
+    for filename, content in files.items():
+        requests.append({
+            "custom_id": f"review:{filename}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _request_body(model, reviewer.build_messages(content), CodeReview)
+        })
+        requests.append({
+            "custom_id": f"bugs:{filename}",
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": _request_body(model, bug_agent.build_messages(content), BugReport)
+        })
+    return requests
+
+
+def _wait_for_batch(client, batch_id: str):
+    """Poll the batch with exponential backoff until it reaches a terminal status"""
+    delay = POLL_INITIAL_DELAY
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        if batch.status in _TERMINAL_STATUSES:
+            return batch
+        time.sleep(delay)
+        delay = min(delay * 2, POLL_MAX_DELAY)
+
+
+def _parse_results(output: str) -> Dict[str, str]:
+    """Map custom_id -> assistant message content for successful requests"""
+    contents = {}
+    for line in output.splitlines():
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        response = record.get("response") or {}
+        if response.get("status_code") != 200:
+            continue
+        contents[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+    return contents
+
+
+def run_batch_analysis(files: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+    """Review and bug-check files through the Batch API (filename -> (review report, bug report))
+
+    Files whose review or bug analysis did not come back are left out of the result,
+    so callers can analyze them through the regular path.
+    """
+    client = get_openai_llm().root_client
+    payload = "\n".join(json.dumps(request) for request in _build_requests(files))
+    input_file = client.files.create(file=("analysis_batch.jsonl", io.BytesIO(payload.encode())), purpose="batch")
+    batch = client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window=COMPLETION_WINDOW
+    )
+    print(f"📦 Submitted batch {batch.id} with {len(files) * 2} requests")
+
+    batch = _wait_for_batch(client, batch.id)
+    if batch.status != "completed" or not batch.output_file_id:
+        print(f"⚠️ Batch {batch.id} ended with status '{batch.status}'")
+        return {}
+
+    contents = _parse_results(client.files.content(batch.output_file_id).text)
+    reviewer, bug_agent = _reviewer(), _bug_agent()
+    results = {}
+    for filename in files:
+        review_json = contents.get(f"review:{filename}")
+        bugs_json = contents.get(f"bugs:{filename}")
+        if review_json is None or bugs_json is None:
+            continue
+        try:
+            review = CodeReview.model_validate_json(review_json)
+            report = BugReport.model_validate_json(bugs_json)
+        except Exception as e:
+            print(f"⚠️ Could not parse batch result for {filename}: {str(e)}")
+            continue
+        results[filename] = (reviewer.generate_report(review), bug_agent.generate_bug_report(report))
+    return results
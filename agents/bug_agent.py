@@ -1,8 +1,10 @@
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
+from functools import lru_cache
+from llm_cache import cached_invoke, acached_invoke
+from llm_client import get_openai_llm
+from prompt_files import format_files, run_batch, arun_batch, render_results
 
 
 class Bug(BaseModel):
@@ -30,13 +32,16 @@ class BugReport(BaseModel):
     crash_probability: str = Field(description="high|medium|low - likelihood of runtime crashes")
 
 
-class BugReportingAgent:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
-        self.parser = PydanticOutputParser(pydantic_object=BugReport)
-        
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a bug detection specialist. Analyze code for runtime errors that cause crashes, exceptions, or security vulnerabilities.
+class FileBugReport(BaseModel):
+    filename: str = Field(description="File name exactly as given in the request")
+    report: BugReport = Field(description="Bug report for this file")
+
+
+class BugReportBatch(BaseModel):
+    reports: List[FileBugReport] = Field(description="One bug report per analyzed file")
+
+
+SYSTEM_PROMPT = """You are a bug detection specialist. Analyze code for runtime errors that cause crashes, exceptions, or security vulnerabilities.
 
 Focus on identifying:
 - Null/undefined pointer dereferences
@@ -50,9 +55,9 @@ Focus on identifying:
 - SQL injection and XSS vulnerabilities
 - Authentication and authorization flaws
 
-For each bug, specify the EXACT line number and explain what runtime error will occur."""),
-            
-            ("human", """Analyze this code for runtime bugs and security vulnerabilities:
+For each bug, specify the EXACT line number and explain what runtime error will occur."""
+
+HUMAN_TEMPLATE = """Analyze this code for runtime bugs and security vulnerabilities:
 
 ```
 {code}
@@ -61,73 +66,170 @@ For each bug, specify the EXACT line number and explain what runtime error will
 Examine each line for potential execution errors. Report:
 1. Line-specific bugs that cause runtime failures
 2. Security vulnerabilities with exploitation scenarios  
-3. Overall crash probability assessment
+3. Overall crash probability assessment"""
+
+# Several small files analyzed in one request, one report per file
+BATCH_HUMAN_TEMPLATE = """Analyze each of the following files for runtime bugs and security vulnerabilities:
+
+{files}
+
+Analyze every file independently and return one report per file, using the file name exactly as shown in its === header ===.
+Line numbers are relative to the start of each file. For each file report:
+1. Line-specific bugs that cause runtime failures
+2. Security vulnerabilities with exploitation scenarios  
+3. Overall crash probability assessment"""
+
 
-{format_instructions}""")
-        ])
+class BugReportingAgent:
+    def __init__(self):
+        self.llm = get_openai_llm()
+        # Native JSON-schema output: no format instructions in the prompt and no text re-parsing
+        self.structured_llm = self.llm.with_structured_output(BugReport, method="json_schema")
+        self.batch_llm = self.llm.with_structured_output(BugReportBatch, method="json_schema")
+        # The system message never changes, so build it once
+        self._system_msg = SystemMessage(content=SYSTEM_PROMPT)
+
+    def build_messages(self, code: str) -> List[BaseMessage]:
+        return [self._system_msg, HumanMessage(content=HUMAN_TEMPLATE.format(code=code))]
+
+    def build_batch_messages(self, files: Dict[str, str]) -> List[BaseMessage]:
+        return [self._system_msg, HumanMessage(content=BATCH_HUMAN_TEMPLATE.format(files=format_files(files)))]
 
     def analyze_bugs(self, code: str) -> BugReport:
         try:
-            response = self.llm.invoke(
-                self.prompt.format_messages(
-                    code=code,
-                    format_instructions=self.parser.get_format_instructions()
-                )
-            )
-            return self.parser.parse(response.content)
+            return self._invoke(code)
         except Exception as e:
-            # Count lines for fallback
-            line_count = len(code.split('\n'))
-            return BugReport(
-                file_analysis="Analysis failed due to parsing error",
-                total_lines=line_count,
-                bugs=[Bug(
-                    line_number=1,
-                    bug_type="syntax_error", 
-                    severity="high",
-                    description="Code analysis failed - potential syntax issues",
-                    error_scenario=f"Parser error: {str(e)}",
-                    fix_suggestion="Verify code syntax and structure"
-                )],
-                security_issues=[],
-                crash_probability="high"
-            )
+            return self._failed_report(code, e)
+
+    def _invoke(self, code: str) -> BugReport:
+        """Analyze one file, raising on failure instead of returning a failed report"""
+        return cached_invoke(
+            self.structured_llm,
+            self.build_messages(code),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+
+    def _invoke_batch(self, files: Dict[str, str]) -> Dict[str, BugReport]:
+        batch = cached_invoke(
+            self.batch_llm,
+            self.build_batch_messages(files),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+        return {item.filename: item.report for item in batch.reports}
+
+    def analyze_bugs_batch(self, files: Dict[str, str]) -> Dict[str, Union[BugReport, Exception]]:
+        """Analyze several files in a single request; files whose analysis failed map to the exception"""
+        return run_batch(files, self._invoke_batch, self._invoke)
+
+    async def aanalyze_bugs(self, code: str) -> BugReport:
+        """Async variant of analyze_bugs, so files can be analyzed concurrently"""
+        try:
+            return await self._ainvoke(code)
+        except Exception as e:
+            return self._failed_report(code, e)
+
+    async def _ainvoke(self, code: str) -> BugReport:
+        """Analyze one file, raising on failure instead of returning a failed report"""
+        return await acached_invoke(
+            self.structured_llm,
+            self.build_messages(code),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+
+    async def _ainvoke_batch(self, files: Dict[str, str]) -> Dict[str, BugReport]:
+        batch = await acached_invoke(
+            self.batch_llm,
+            self.build_batch_messages(files),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+        return {item.filename: item.report for item in batch.reports}
+
+    async def aanalyze_bugs_batch(self, files: Dict[str, str]) -> Dict[str, Union[BugReport, Exception]]:
+        """Async variant of analyze_bugs_batch"""
+        return await arun_batch(files, self._ainvoke_batch, self._ainvoke)
+
+    def _failed_report(self, code: str, e: Exception) -> BugReport:
+        # Count lines for fallback without materializing them
+        line_count = code.count('\n') + (1 if code and not code.endswith('\n') else 0)
+        return BugReport(
+            file_analysis="Analysis failed due to parsing error",
+            total_lines=line_count,
+            bugs=[Bug(
+                line_number=1,
+                bug_type="syntax_error", 
+                severity="high",
+                description="Code analysis failed - potential syntax issues",
+                error_scenario=f"Parser error: {str(e)}",
+                fix_suggestion="Verify code syntax and structure"
+            )],
+            security_issues=[],
+            crash_probability="high"
+        )
 
     def generate_bug_report(self, report: BugReport) -> str:
-        lines = [
-            "# 🐛 BUG REPORT",
-            f"**File Analysis:** {report.file_analysis}",
-            f"**Lines Analyzed:** {report.total_lines}",
-            f"**Crash Risk:** {report.crash_probability.upper()}\n"
-        ]
-        
-        if report.bugs:
-            lines.append("## 🚨 RUNTIME BUGS:")
-            for bug in report.bugs:
-                lines.extend([
-                    f"**Line {bug.line_number} - {bug.bug_type.upper()} [{bug.severity.upper()}]**",
-                    f"💥 **Error:** {bug.description}",
-                    f"⚠️  **Trigger:** {bug.error_scenario}",
-                    f"🔧 **Fix:** {bug.fix_suggestion}\n"
-                ])
-        
-        if report.security_issues:
-            lines.append("## 🔒 SECURITY VULNERABILITIES:")
-            for vuln in report.security_issues:
-                lines.extend([
-                    f"**Line {vuln.line_number} - {vuln.vulnerability_type.upper()} [{vuln.risk_level.upper()}]**",
-                    f"🎯 **Exploit:** {vuln.exploit_scenario}",
-                    f"🛡️  **Fix:** {vuln.mitigation}\n"
-                ])
-        
-        if not report.bugs and not report.security_issues:
-            lines.append("✅ **No critical bugs detected in static analysis**")
-        
-        return "\n".join(lines)
+        return "\n".join(_iter_report_lines(report))
+
+
+def _iter_report_lines(report: BugReport):
+    """Yield the markdown lines of a bug report"""
+    yield "# 🐛 BUG REPORT"
+    yield f"**File Analysis:** {report.file_analysis}"
+    yield f"**Lines Analyzed:** {report.total_lines}"
+    yield f"**Crash Risk:** {report.crash_probability.upper()}\n"
+    
+    if report.bugs:
+        yield "## 🚨 RUNTIME BUGS:"
+        for bug in report.bugs:
+            yield f"**Line {bug.line_number} - {bug.bug_type.upper()} [{bug.severity.upper()}]**"
+            yield f"💥 **Error:** {bug.description}"
+            yield f"⚠️  **Trigger:** {bug.error_scenario}"
+            yield f"🔧 **Fix:** {bug.fix_suggestion}\n"
+    
+    if report.security_issues:
+        yield "## 🔒 SECURITY VULNERABILITIES:"
+        for vuln in report.security_issues:
+            yield f"**Line {vuln.line_number} - {vuln.vulnerability_type.upper()} [{vuln.risk_level.upper()}]**"
+            yield f"🎯 **Exploit:** {vuln.exploit_scenario}"
+            yield f"🛡️  **Fix:** {vuln.mitigation}\n"
+    
+    if not report.bugs and not report.security_issues:
+        yield "✅ **No critical bugs detected in static analysis**"
+
+@lru_cache(maxsize=1)
+def _bug_agent() -> BugReportingAgent:
+    """Process-wide agent, so every call reuses one client and connection pool"""
+    return BugReportingAgent()
 
 
 def find_bugs(code_content: str) -> str:
     """Analyze code for runtime bugs and security issues"""
-    agent = BugReportingAgent()
+    agent = _bug_agent()
     bug_report = agent.analyze_bugs(code_content)
-    return agent.generate_bug_report(bug_report)
\ No newline at end of file
+    return agent.generate_bug_report(bug_report)
+
+
+async def afind_bugs(code_content: str) -> str:
+    """Async variant of find_bugs"""
+    agent = _bug_agent()
+    bug_report = await agent.aanalyze_bugs(code_content)
+    return agent.generate_bug_report(bug_report)
+
+
+def find_bugs_batch(files: Dict[str, str]) -> Dict[str, Union[str, Exception]]:
+    """Analyze several files for bugs with one LLM request (filename -> bug report)
+
+    Files whose analysis failed map to the exception instead of a report, so callers
+    can tell a failure apart from a report and avoid caching it.
+    """
+    agent = _bug_agent()
+    return render_results(agent.analyze_bugs_batch(files), agent.generate_bug_report)
+
+
+async def afind_bugs_batch(files: Dict[str, str]) -> Dict[str, Union[str, Exception]]:
+    """Async variant of find_bugs_batch"""
+    agent = _bug_agent()
+    return render_results(await agent.aanalyze_bugs_batch(files), agent.generate_bug_report)
@@ -0,0 +1,74 @@
+"""Per-file classification for ReadmeGenerator.scan_repository.
+
+Kept free of I/O and fully annotated so it can be compiled with mypyc
+(`mypyc classify.py`); the pure-Python module works unchanged otherwise.
+"""
+import os
+import re
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+
+# Files whose content is read: by extension (code, config, docs) or by exact name
+READ_EXTENSIONS: FrozenSet[str] = frozenset({
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.go', '.rs', '.php', '.rb', '.swift', '.kt',
+    '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf',
+    '.md', '.txt', '.rst', '.org'
+})
+READ_NAMES_LOWER: FrozenSet[str] = frozenset({'readme.md', 'package.json', 'requirements.txt', 'dockerfile', 'makefile'})
+
+# Deployment configuration files to detect
+DEPLOYMENT_FILES: Dict[str, str] = {
+    'Dockerfile': 'docker',
+    'docker-compose.yml': 'docker-compose',
+    'docker-compose.yaml': 'docker-compose',
+    'Procfile': 'heroku',
+    'vercel.json': 'vercel',
+    'netlify.toml': 'netlify',
+    '.platform.app.yaml': 'platform.sh',
+    'app.yaml': 'gcp',
+    'appspec.yml': 'aws-codedeploy',
+    'buildspec.yml': 'aws-codebuild',
+    'azure-pipelines.yml': 'azure',
+    'cloudbuild.yaml': 'gcp-cloudbuild',
+    'railway.json': 'railway',
+    'render.yaml': 'render'
+}
+
+# Architecture indicator files, matched as substrings of the lowercased relative path
+ARCHITECTURE_FILES: Dict[str, List[str]] = {
+    'microservices': ['docker-compose.yml', 'kubernetes/', 'k8s/', 'helm/'],
+    'monolith': ['main.py', 'app.py', 'index.js', 'server.js'],
+    'frontend': ['package.json', 'src/', 'public/', 'components/', 'pages/'],
+    'backend': ['api/', 'routes/', 'models/', 'controllers/', 'services/'],
+    'database': ['migrations/', 'schema.sql', 'models.py', 'entity/', 'repositories/'],
+    'mobile': ['android/', 'ios/', 'flutter/', 'react-native/', 'xamarin/'],
+    'ml': ['models/', 'notebooks/', 'data/', 'train.py', 'predict.py']
+}
+
+# Indicator -> architecture types it signals (an indicator may appear under several)
+INDICATOR_ARCHITECTURES: Dict[str, List[str]] = {}
+for _arch_type, _indicators in ARCHITECTURE_FILES.items():
+    for _indicator in _indicators:
+        INDICATOR_ARCHITECTURES.setdefault(_indicator, []).append(_arch_type)
+
+# One automaton for every indicator: the zero-width lookahead lets finditer report
+# overlapping matches in a single left-to-right pass over the path (no indicator
+# is a prefix of another, so one match per position loses nothing)
+INDICATOR_PATTERN = re.compile(
+    '(?=(' + '|'.join(re.escape(indicator) for indicator in sorted(INDICATOR_ARCHITECTURES, key=len, reverse=True)) + '))'
+)
+
+
+def classify_entry(name: str, relative_path: str) -> Tuple[str, Optional[str], List[str], bool]:
+    """Return (extension, deployment platform, architecture types, whether to read the content)"""
+    file_ext = os.path.splitext(name)[1].lower()
+    deployment_platform = DEPLOYMENT_FILES.get(name)
+
+    # Architecture indicators in one pass over the path, reported in ARCHITECTURE_FILES order
+    matched_archs: Set[str] = set()
+    for match in INDICATOR_PATTERN.finditer(relative_path.lower()):
+        matched_archs.update(INDICATOR_ARCHITECTURES[match.group(1)])
+    arch_types = [arch_type for arch_type in ARCHITECTURE_FILES if arch_type in matched_archs] if matched_archs else []
+
+    should_read = (file_ext in READ_EXTENSIONS or name.lower() in READ_NAMES_LOWER
+                   or deployment_platform is not None)
+    return file_ext, deployment_platform, arch_types, should_read
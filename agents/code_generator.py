@@ -1,21 +1,39 @@
 from langchain_anthropic import ChatAnthropic
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
-from langchain.memory import ConversationBufferMemory
-from langchain.schema import BaseMessage, HumanMessage, AIMessage
+from langchain.memory import ConversationBufferWindowMemory
+from langchain.schema import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain.output_parsers import PydanticOutputParser
 from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional, TypedDict
-from langgraph.graph import Graph, StateGraph, END
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple, TypedDict
+from functools import lru_cache
+from langgraph.graph import Graph, StateGraph, START, END
 from langgraph.prebuilt import ToolExecutor
+from langchain_core.runnables import RunnableLambda
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import hashlib
 import os
 from dotenv import load_dotenv
 
-# Import existing agents
-from code_review import review_code
-from bug_agent import find_bugs
-
 load_dotenv()
 
+# Small files are packed into shared review/bug requests up to this many
+# estimated tokens; files at or above it are analyzed on their own
+BATCH_TOKEN_BUDGET = 12000
+
+# Conversation exchanges (user + assistant) sent back to Claude each turn
+HISTORY_WINDOW_TURNS = 8
+
+# Concurrent group reviews/bug analyses on the sync path
+ANALYSIS_WORKERS = 16
+# Concurrent file reads in load_files_from_paths
+READ_WORKERS = 16
+
+def _result_or_exception(future):
+    """A future's result, or the exception it raised (like gather(return_exceptions=True))"""
+    error = future.exception()
+    return error if error is not None else future.result()
+
 # State definition for LangGraph
 class CodeGeneratorState(TypedDict):
     input_files: Dict[str, str]  # filename -> content
@@ -26,6 +44,11 @@ class CodeGeneratorState(TypedDict):
     current_query: str
     generated_response: str
     context_ready: bool
+    analysis_cached: bool  # True when the results/summary above came from the previous turn
+    analysis_complete: bool  # True when every file's review and bug analysis succeeded
+    # Per-session objects, carried in state so the compiled graph can be shared
+    code_agent: Any  # CodeGeneratorAgent
+    analysis_cache: Dict[str, Tuple[str, str]]  # sha256(content) -> (review, bug report)
 
 class CodeGenerationRequest(BaseModel):
     task_type: str = Field(description="refactor|optimize|debug|extend|create_new|explain|test")
@@ -38,10 +61,16 @@ class CodeGeneratorAgent:
         self.llm = ChatAnthropic(
             model="claude-3-5-sonnet-20241022",  # Claude Sonnet 4
             temperature=0.1,
-            max_tokens=4000
+            max_tokens=4000,
+            default_headers={"anthropic-beta": "prompt-caching-2024-07-31"}
         )
         
-        self.memory = ConversationBufferMemory(
+        # Prompt-cache usage reported by Anthropic, accumulated per agent
+        self.cache_stats = {"cache_read_input_tokens": 0, "cache_creation_input_tokens": 0}
+        
+        # Only the last few exchanges are replayed, so per-turn input stays bounded
+        self.memory = ConversationBufferWindowMemory(
+            k=HISTORY_WINDOW_TURNS,
             memory_key="chat_history",
             return_messages=True,
             output_key="response"
@@ -78,11 +107,11 @@ COMMUNICATION STYLE:
 - Suggest additional improvements or considerations
 """
 
-        self.prompt_template = ChatPromptTemplate.from_messages([
-            ("system", self.system_prompt),
-            ("human", """
-ANALYSIS CONTEXT:
-{analysis_summary}
+        # Session context is identical on every turn, so it goes into the system
+        # block ahead of the cache breakpoint; only the request changes per turn
+        self.context_template = """
+ORIGINAL CODE FILES:
+{original_files}
 
 CODE REVIEW FINDINGS:
 {code_reviews}
@@ -90,106 +119,239 @@ CODE REVIEW FINDINGS:
 BUG ANALYSIS RESULTS:
 {bug_reports}
 
-ORIGINAL CODE FILES:
-{original_files}
+ANALYSIS CONTEXT:
+{analysis_summary}
+"""
 
+        self.request_template = """
 CURRENT REQUEST:
 {user_query}
 
 Please generate code that addresses the issues found in analysis and fulfills the user's request. 
 Prioritize fixing critical bugs and security vulnerabilities while implementing the requested functionality.
-"""),
-            MessagesPlaceholder(variable_name="chat_history"),
-        ])
+"""
 
-    def generate_code(self, state: CodeGeneratorState) -> str:
-        """Generate code based on analysis and user request"""
+    def _build_messages(self, state: CodeGeneratorState) -> List[BaseMessage]:
+        """Build the prompt with static content first and a cache breakpoint after it"""
+        analysis_summary = state.get("analysis_summary", "")
+        code_reviews = "\n".join([f"File: {name}\n{review}" 
+                                for name, review in state.get("code_review_results", {}).items()])
+        bug_reports = "\n".join([f"File: {name}\n{report}" 
+                               for name, report in state.get("bug_analysis_results", {}).items()])
+        original_files = "\n".join([f"=== {name} ===\n{content}" 
+                                   for name, content in state.get("input_files", {}).items()])
+        
+        context = self.context_template.format(
+            original_files=original_files,
+            code_reviews=code_reviews,
+            bug_reports=bug_reports,
+            analysis_summary=analysis_summary
+        )
+        
+        return [
+            SystemMessage(content=[
+                {"type": "text", "text": self.system_prompt},
+                {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}}
+            ]),
+            *state.get("chat_history", []),
+            HumanMessage(content=self.request_template.format(user_query=state["current_query"]))
+        ]
+
+    def _record_cache_usage(self, response) -> None:
+        usage = response.response_metadata.get("usage", {}) or {}
+        # Streamed responses report cache usage through usage_metadata instead
+        details = (getattr(response, "usage_metadata", None) or {}).get("input_token_details", {}) or {}
+        self.cache_stats["cache_read_input_tokens"] += (
+            usage.get("cache_read_input_tokens") or details.get("cache_read") or 0)
+        self.cache_stats["cache_creation_input_tokens"] += (
+            usage.get("cache_creation_input_tokens") or details.get("cache_creation") or 0)
+
+    async def astream_code(self, state: CodeGeneratorState) -> AsyncIterator[str]:
+        """Stream generated code as Claude produces it"""
+        response = None
         try:
-            # Prepare context strings
-            analysis_summary = state.get("analysis_summary", "")
-            code_reviews = "\n".join([f"File: {name}\n{review}" 
-                                    for name, review in state.get("code_review_results", {}).items()])
-            bug_reports = "\n".join([f"File: {name}\n{report}" 
-                                   for name, report in state.get("bug_analysis_results", {}).items()])
-            original_files = "\n".join([f"=== {name} ===\n{content}" 
-                                       for name, content in state.get("input_files", {}).items()])
-
-            # Create the prompt
-            formatted_prompt = self.prompt_template.format_messages(
-                analysis_summary=analysis_summary,
-                code_reviews=code_reviews,
-                bug_reports=bug_reports,
-                original_files=original_files,
-                user_query=state["current_query"],
-                chat_history=state.get("chat_history", [])
-            )
-            
-            response = self.llm.invoke(formatted_prompt)
+            async for chunk in self.llm.astream(self._build_messages(state)):
+                response = chunk if response is None else response + chunk
+                if chunk.content:
+                    yield chunk.content
+        except Exception as e:
+            yield f"❌ Error generating code: {str(e)}"
+            return
+        
+        if response is not None:
+            self._record_cache_usage(response)
             
-            # Save to memory
+            # Save the full response to memory once the stream is complete
             self.memory.save_context(
                 {"input": state["current_query"]},
                 {"response": response.content}
             )
-            
-            return response.content
-            
+
+    def recent_history(self) -> List[BaseMessage]:
+        """Chat history limited to the memory window; it follows the cache breakpoint in the prompt"""
+        return self.memory.load_memory_variables({})["chat_history"]
+
+    async def agenerate_code(self, state: CodeGeneratorState) -> str:
+        """Generate code based on analysis and user request"""
+        return "".join([chunk async for chunk in self.astream_code(state)])
+
+    def generate_code(self, state: CodeGeneratorState) -> str:
+        """Sync variant of agenerate_code, using the sync Anthropic client"""
+        try:
+            response = self.llm.invoke(self._build_messages(state))
         except Exception as e:
             return f"❌ Error generating code: {str(e)}"
+        
+        self._record_cache_usage(response)
+        self.memory.save_context(
+            {"input": state["current_query"]},
+            {"response": response.content}
+        )
+        return response.content
 
 class CodeGeneratorWorkflow:
     def __init__(self):
         self.code_agent = CodeGeneratorAgent()
-        self.workflow = self._build_workflow()
+        # sha256(file content) -> (code review, bug report)
+        self._analysis_cache: Dict[str, Tuple[str, str]] = {}
+        # Results of the last full analysis pass, reused while the session files are unchanged
+        self._last_analysis: Optional[Tuple[tuple, Dict[str, str], Dict[str, str], str]] = None
+        self.workflow = _compiled_workflow()
     
-    def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
-        workflow = StateGraph(CodeGeneratorState)
-        
-        # Add nodes
-        workflow.add_node("analyze_code_quality", self._analyze_code_quality)
-        workflow.add_node("detect_bugs", self._detect_bugs)
-        workflow.add_node("create_analysis_summary", self._create_analysis_summary)
-        workflow.add_node("generate_code_response", self._generate_code_response)
-        
-        # Define the flow
-        workflow.set_entry_point("analyze_code_quality")
-        workflow.add_edge("analyze_code_quality", "detect_bugs")
-        workflow.add_edge("detect_bugs", "create_analysis_summary")
-        workflow.add_edge("create_analysis_summary", "generate_code_response")
-        workflow.add_edge("generate_code_response", END)
-        
-        return workflow.compile()
+    @staticmethod
+    def _content_hash(content: str) -> str:
+        return hashlib.sha256(content.encode()).hexdigest()
     
-    def _analyze_code_quality(self, state: CodeGeneratorState) -> CodeGeneratorState:
-        """Run code review analysis on all input files"""
-        code_review_results = {}
+    def invalidate_analysis(self, contents) -> None:
+        """Drop cached analyses for the given file contents"""
+        for content in contents:
+            self._analysis_cache.pop(self._content_hash(content), None)
+        self._last_analysis = None
+    
+    def _files_fingerprint(self, files: Dict[str, str]) -> tuple:
+        return tuple((name, self._content_hash(content)) for name, content in files.items())
+    
+    def _remember_analysis(self, state: CodeGeneratorState) -> None:
+        # A pass with failed files is not reused; the next turn re-analyzes just those files,
+        # since the successful ones are served from the per-content cache
+        if not state["analysis_cached"] and state["analysis_complete"]:
+            self._last_analysis = (
+                self._files_fingerprint(state["input_files"]),
+                state["code_review_results"],
+                state["bug_analysis_results"],
+                state["analysis_summary"]
+            )
+
+    def prefetch_analysis_batch(self, files: Dict[str, str]) -> None:
+        """Fill the analysis cache through the OpenAI Batch API (cheaper, but slow)"""
+        from batch_analysis import run_batch_analysis
+        pending = {name: content for name, content in files.items()
+                   if self._content_hash(content) not in self._analysis_cache}
+        if not pending:
+            return
+        for filename, analysis in run_batch_analysis(pending).items():
+            self._analysis_cache[self._content_hash(pending[filename])] = analysis
+    
+    @staticmethod
+    def _analyze_all(state: CodeGeneratorState) -> CodeGeneratorState:
+        """Sync variant of _analyze_all_parallel, running the groups on a thread pool with the sync clients"""
+        code_review_results, bug_analysis_results, pending = CodeGeneratorWorkflow._split_cached(state)
+        groups, review_groups, bug_groups = [], [], []
         
-        for filename, content in state["input_files"].items():
-            try:
-                review_result = review_code(content)
-                code_review_results[filename] = review_result
-            except Exception as e:
-                code_review_results[filename] = f"Review failed: {str(e)}"
+        if pending:
+            # Imported on first use: the agent modules pull in the OpenAI client stack
+            from code_review import review_code_batch
+            from bug_agent import find_bugs_batch
+            
+            groups = _pack_files({name: content for name, (_, content) in pending.items()})
+            with ThreadPoolExecutor(max_workers=min(ANALYSIS_WORKERS, 2 * len(groups))) as executor:
+                review_futures = [executor.submit(review_code_batch, group) for group in groups]
+                bug_futures = [executor.submit(find_bugs_batch, group) for group in groups]
+                review_groups = [_result_or_exception(future) for future in review_futures]
+                bug_groups = [_result_or_exception(future) for future in bug_futures]
         
-        state["code_review_results"] = code_review_results
+        CodeGeneratorWorkflow._merge_analyses(state, pending, groups, review_groups, bug_groups,
+                                              code_review_results, bug_analysis_results)
         return state
     
-    def _detect_bugs(self, state: CodeGeneratorState) -> CodeGeneratorState:
-        """Run bug detection analysis on all input files"""
-        bug_analysis_results = {}
+    @staticmethod
+    async def _analyze_all_parallel(state: CodeGeneratorState) -> CodeGeneratorState:
+        """Run code review and bug detection on all input files concurrently"""
+        code_review_results, bug_analysis_results, pending = CodeGeneratorWorkflow._split_cached(state)
+        groups, review_groups, bug_groups = [], [], []
         
-        for filename, content in state["input_files"].items():
-            try:
-                bug_result = find_bugs(content)
-                bug_analysis_results[filename] = bug_result
-            except Exception as e:
-                bug_analysis_results[filename] = f"Bug analysis failed: {str(e)}"
+        if pending:
+            # Imported on first use: the agent modules pull in the OpenAI client stack
+            from code_review import areview_code_batch
+            from bug_agent import afind_bugs_batch
+            
+            groups = _pack_files({name: content for name, (_, content) in pending.items()})
+            
+            # Every group review and bug analysis is an independent LLM round-trip,
+            # so launch them all at once instead of group by group
+            results = await asyncio.gather(
+                *[areview_code_batch(group) for group in groups],
+                *[afind_bugs_batch(group) for group in groups],
+                return_exceptions=True
+            )
+            review_groups, bug_groups = results[:len(groups)], results[len(groups):]
         
-        state["bug_analysis_results"] = bug_analysis_results
+        CodeGeneratorWorkflow._merge_analyses(state, pending, groups, review_groups, bug_groups,
+                                              code_review_results, bug_analysis_results)
         return state
     
-    def _create_analysis_summary(self, state: CodeGeneratorState) -> CodeGeneratorState:
+    @staticmethod
+    def _split_cached(state: CodeGeneratorState) -> Tuple[Dict[str, str], Dict[str, str], Dict[str, Tuple[str, str]]]:
+        """Serve already-analyzed file contents from the cache; return (reviews, bug reports, pending files)"""
+        analysis_cache = state["analysis_cache"]
+        code_review_results = {}
+        bug_analysis_results = {}
+        pending = {}
+        for filename, content in state["input_files"].items():
+            content_hash = CodeGeneratorWorkflow._content_hash(content)
+            cached = analysis_cache.get(content_hash)
+            if cached:
+                code_review_results[filename], bug_analysis_results[filename] = cached
+            else:
+                pending[filename] = (content_hash, content)
+        return code_review_results, bug_analysis_results, pending
+    
+    @staticmethod
+    def _merge_analyses(state: CodeGeneratorState, pending: Dict[str, Tuple[str, str]],
+                        groups: List[Dict[str, str]], review_groups: list, bug_groups: list,
+                        code_review_results: Dict[str, str], bug_analysis_results: Dict[str, str]) -> None:
+        """Fold group results into the state, caching only files whose analyses both succeeded"""
+        analysis_cache = state["analysis_cache"]
+        failed_files = []
+        
+        for group, group_reviews, group_bugs in zip(groups, review_groups, bug_groups):
+            for filename in group:
+                # A whole group can fail, or single files inside it (they map to their exception)
+                review = group_reviews if isinstance(group_reviews, BaseException) else group_reviews[filename]
+                bug = group_bugs if isinstance(group_bugs, BaseException) else group_bugs[filename]
+                
+                if isinstance(review, BaseException):
+                    code_review_results[filename] = f"Review failed: {str(review)}"
+                else:
+                    code_review_results[filename] = review
+                if isinstance(bug, BaseException):
+                    bug_analysis_results[filename] = f"Bug analysis failed: {str(bug)}"
+                else:
+                    bug_analysis_results[filename] = bug
+                
+                # Only cache complete, successful analyses
+                if not isinstance(review, BaseException) and not isinstance(bug, BaseException):
+                    analysis_cache[pending[filename][0]] = (review, bug)
+                else:
+                    failed_files.append(filename)
+        
+        # Keep results in input file order
+        state["code_review_results"] = {name: code_review_results[name] for name in state["input_files"]}
+        state["bug_analysis_results"] = {name: bug_analysis_results[name] for name in state["input_files"]}
+        state["analysis_complete"] = not failed_files
+    
+    @staticmethod
+    def _create_analysis_summary(state: CodeGeneratorState) -> CodeGeneratorState:
         """Create a comprehensive analysis summary"""
         summary_parts = []
         
@@ -222,16 +384,22 @@ class CodeGeneratorWorkflow:
         state["context_ready"] = True
         return state
     
-    def _generate_code_response(self, state: CodeGeneratorState) -> CodeGeneratorState:
+    @staticmethod
+    def _generate_code_response_sync(state: CodeGeneratorState) -> CodeGeneratorState:
+        """Sync variant of _generate_code_response"""
+        state["generated_response"] = state["code_agent"].generate_code(state)
+        return state
+    
+    @staticmethod
+    async def _generate_code_response(state: CodeGeneratorState) -> CodeGeneratorState:
         """Generate the final code response"""
-        response = self.code_agent.generate_code(state)
+        response = await state["code_agent"].agenerate_code(state)
         state["generated_response"] = response
         return state
     
-    def process_files_and_query(self, files: Dict[str, str], query: str, 
-                               chat_history: List[BaseMessage] = None) -> str:
-        """Process code files and generate response for user query"""
-        initial_state = CodeGeneratorState(
+    def _initial_state(self, files: Dict[str, str], query: str,
+                       chat_history: List[BaseMessage] = None) -> CodeGeneratorState:
+        state = CodeGeneratorState(
             input_files=files,
             code_review_results={},
             bug_analysis_results={},
@@ -239,12 +407,79 @@ class CodeGeneratorWorkflow:
             chat_history=chat_history or [],
             current_query=query,
             generated_response="",
-            context_ready=False
+            context_ready=False,
+            analysis_cached=False,
+            analysis_complete=False,
+            code_agent=self.code_agent,
+            analysis_cache=self._analysis_cache
         )
         
-        # Run the workflow
+        # Follow-up turns over the same files skip straight to generation
+        if self._last_analysis and self._last_analysis[0] == self._files_fingerprint(files):
+            _, reviews, bugs, summary = self._last_analysis
+            state["code_review_results"] = reviews
+            state["bug_analysis_results"] = bugs
+            state["analysis_summary"] = summary
+            state["context_ready"] = True
+            state["analysis_cached"] = True
+            state["analysis_complete"] = True
+        return state
+    
+    def process_files_and_query(self, files: Dict[str, str], query: str, 
+                               chat_history: List[BaseMessage] = None) -> str:
+        """Process code files and generate response for user query"""
+        initial_state = self._initial_state(files, query, chat_history)
+        
+        # The sync path stays on the sync clients, so it never needs (or touches) an event loop
         final_state = self.workflow.invoke(initial_state)
+        self._remember_analysis(final_state)
         return final_state["generated_response"]
+    
+    async def aprocess_files_and_query(self, files: Dict[str, str], query: str, 
+                                      chat_history: List[BaseMessage] = None) -> str:
+        """Async variant of process_files_and_query"""
+        initial_state = self._initial_state(files, query, chat_history)
+        
+        # Run the workflow with the async node implementations
+        final_state = await self.workflow.ainvoke(initial_state)
+        self._remember_analysis(final_state)
+        return final_state["generated_response"]
+    
+    async def astream_files_and_query(self, files: Dict[str, str], query: str,
+                                      chat_history: List[BaseMessage] = None) -> AsyncIterator[str]:
+        """Run the analysis nodes, then stream the generated response"""
+        state = self._initial_state(files, query, chat_history)
+        if not state["analysis_cached"]:
+            state = await self._analyze_all_parallel(state)
+            state = self._create_analysis_summary(state)
+            self._remember_analysis(state)
+        
+        async for chunk in self.code_agent.astream_code(state):
+            yield chunk
+
+def _route_entry(state: CodeGeneratorState) -> str:
+    return "generate_code_response" if state.get("analysis_cached") else "analyze_all_parallel"
+
+@lru_cache(maxsize=1)
+def _compiled_workflow():
+    """Build and compile the LangGraph workflow once; its topology never changes"""
+    workflow = StateGraph(CodeGeneratorState)
+    
+    # Add nodes; LLM nodes carry a sync and an async implementation, so invoke() uses the
+    # sync clients and ainvoke() the async ones on the caller's event loop
+    workflow.add_node("analyze_all_parallel", RunnableLambda(
+        CodeGeneratorWorkflow._analyze_all, afunc=CodeGeneratorWorkflow._analyze_all_parallel))
+    workflow.add_node("create_analysis_summary", CodeGeneratorWorkflow._create_analysis_summary)
+    workflow.add_node("generate_code_response", RunnableLambda(
+        CodeGeneratorWorkflow._generate_code_response_sync, afunc=CodeGeneratorWorkflow._generate_code_response))
+    
+    # Define the flow: skip analysis when the previous turn's results still apply
+    workflow.add_conditional_edges(START, _route_entry, ["analyze_all_parallel", "generate_code_response"])
+    workflow.add_edge("analyze_all_parallel", "create_analysis_summary")
+    workflow.add_edge("create_analysis_summary", "generate_code_response")
+    workflow.add_edge("generate_code_response", END)
+    
+    return workflow.compile()
 
 class CodeGeneratorChatbot:
     def __init__(self):
@@ -252,11 +487,21 @@ class CodeGeneratorChatbot:
         self.session_files = {}  # Store files for the session
         self.is_initialized = False
         
-    def initialize_with_files(self, files: Dict[str, str]) -> str:
-        """Initialize the chatbot with code files"""
+    def initialize_with_files(self, files: Dict[str, str], batch: bool = False) -> str:
+        """Initialize the chatbot with code files
+
+        With batch=True the initial reviews and bug analyses go through the OpenAI
+        Batch API: half the cost, but results can take minutes to hours.
+        """
         self.session_files = files
         self.is_initialized = True
         
+        if batch:
+            try:
+                self.workflow.prefetch_analysis_batch(files)
+            except Exception as e:
+                print(f"⚠️ Batch analysis failed, analyzing directly: {str(e)}")
+        
         # Run initial analysis
         analysis_query = "Please analyze the provided code files and give me an overview of their current state, including any issues that need attention."
         
@@ -290,8 +535,8 @@ What would you like me to help you with?"""
         if not self.is_initialized:
             return "❌ Please initialize the chatbot with code files first using `initialize_with_files()`"
         
-        # Get chat history from memory
-        chat_history = self.workflow.code_agent.memory.chat_memory.messages
+        # Get the windowed chat history from memory
+        chat_history = self.workflow.code_agent.recent_history()
         
         # Process the query with context
         response = self.workflow.process_files_and_query(
@@ -302,8 +547,27 @@ What would you like me to help you with?"""
         
         return response
     
+    async def chat_stream(self, user_message: str) -> AsyncIterator[str]:
+        """Handle a chat message, yielding the response as it is generated"""
+        if not self.is_initialized:
+            yield "❌ Please initialize the chatbot with code files first using `initialize_with_files()`"
+            return
+        
+        chat_history = self.workflow.code_agent.recent_history()
+        
+        async for chunk in self.workflow.astream_files_and_query(
+            files=self.session_files,
+            query=user_message,
+            chat_history=chat_history
+        ):
+            yield chunk
+    
     def add_files(self, new_files: Dict[str, str]) -> str:
         """Add new files to the session"""
+        # Only files whose content actually changed lose their cached analysis
+        replaced = [self.session_files[name] for name, content in new_files.items()
+                    if name in self.session_files and self.session_files[name] != content]
+        self.workflow.invalidate_analysis(replaced)
         self.session_files.update(new_files)
         return f"✅ Added {len(new_files)} new file(s) to the session. The context has been updated."
     
@@ -321,18 +585,42 @@ What would you like me to help you with?"""
         self.workflow.code_agent.memory.clear()
         return "🧹 Conversation memory cleared."
 
+def _pack_files(files: Dict[str, str], token_budget: int = BATCH_TOKEN_BUDGET) -> List[Dict[str, str]]:
+    """Group files into batches whose estimated token count (chars / 4) fits the budget"""
+    groups = []
+    current, current_tokens = {}, 0
+    for name, content in files.items():
+        tokens = len(content) // 4
+        if tokens >= token_budget:
+            groups.append({name: content})
+            continue
+        if current and current_tokens + tokens > token_budget:
+            groups.append(current)
+            current, current_tokens = {}, 0
+        current[name] = content
+        current_tokens += tokens
+    if current:
+        groups.append(current)
+    return groups
+
 # Utility functions for easy usage
+def _read_file(path: str) -> Tuple[str, str]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return os.path.basename(path), f.read()
+    except Exception as e:
+        return path, f"Error loading file: {str(e)}"
+
+async def aload_files_from_paths(file_paths: List[str]) -> Dict[str, str]:
+    """Load multiple files concurrently, each read running in a worker thread"""
+    return dict(await asyncio.gather(*[asyncio.to_thread(_read_file, path) for path in file_paths]))
+
 def load_files_from_paths(file_paths: List[str]) -> Dict[str, str]:
-    """Load multiple files from file paths"""
-    files = {}
-    for path in file_paths:
-        try:
-            with open(path, 'r', encoding='utf-8') as f:
-                filename = os.path.basename(path)
-                files[filename] = f.read()
-        except Exception as e:
-            files[path] = f"Error loading file: {str(e)}"
-    return files
+    """Load multiple files from file paths, reading them concurrently on a thread pool"""
+    if not file_paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(READ_WORKERS, len(file_paths))) as executor:
+        return dict(executor.map(_read_file, file_paths))
 
 def load_file_from_string(filename: str, content: str) -> Dict[str, str]:
     """Create file dict from string content"""
@@ -1,12 +1,18 @@
-from langchain_openai import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.output_parsers import PydanticOutputParser
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 from pydantic import BaseModel, Field
-from typing import List
+from typing import Dict, List, Union
+from collections import defaultdict
+from functools import lru_cache
+from llm_cache import cached_invoke, acached_invoke
+from llm_client import get_openai_llm
+from prompt_files import format_files, run_batch, arun_batch, render_results
 from dotenv import load_dotenv
 import os 
 load_dotenv()
 
+# Most issues/optimizations of one kind a report lists
+MAX_PER_SEVERITY = 20
+
 class CodeIssue(BaseModel):
     severity: str = Field(description="critical|high|medium")
     location: str = Field(description="Function/class/line where issue exists")
@@ -27,13 +33,14 @@ class CodeReview(BaseModel):
     optimizations: List[Optimization] = Field(description="Performance and design improvements")
     key_insights: List[str] = Field(description="Important observations about code logic and design")
 
-class TechnicalReviewer:
-    def __init__(self):
-        self.llm = ChatOpenAI(model="gpt-4o", temperature=0)
-        self.parser = PydanticOutputParser(pydantic_object=CodeReview)
-        
-        self.prompt = ChatPromptTemplate.from_messages([
-            ("system", """You are a senior developer doing code review. Focus ONLY on actionable insights that help developers improve their code.
+class FileCodeReview(BaseModel):
+    filename: str = Field(description="File name exactly as given in the request")
+    review: CodeReview = Field(description="Code review for this file")
+
+class CodeReviewBatch(BaseModel):
+    reviews: List[FileCodeReview] = Field(description="One code review per reviewed file")
+
+SYSTEM_PROMPT = """You are a senior developer doing code review. Focus ONLY on actionable insights that help developers improve their code.
 
 WHAT TO ANALYZE:
 1. Logic errors and bugs
@@ -50,9 +57,9 @@ WHAT TO IGNORE:
 - Overly detailed explanations
 - Analysis that doesn't lead to actionable changes
 
-BE PRACTICAL: Every insight should help the developer write better code."""),
-            
-            ("human", """Review this code and provide only substantial, actionable feedback:
+BE PRACTICAL: Every insight should help the developer write better code."""
+
+HUMAN_TEMPLATE = """Review this code and provide only substantial, actionable feedback:
 
 ```
 {code}
@@ -66,132 +73,228 @@ Focus on:
 - Algorithm optimizations
 - Code intent and what it's trying to accomplish
 
-Skip minor issues. Only mention problems worth fixing and optimizations worth implementing.
+Skip minor issues. Only mention problems worth fixing and optimizations worth implementing."""
+
+# Several small files reviewed in one request, one review per file
+BATCH_HUMAN_TEMPLATE = """Review each of the following files and provide only substantial, actionable feedback:
 
-{format_instructions}""")
-        ])
+{files}
+
+Review every file independently and return one review per file, using the file name exactly as shown in its === header ===.
+
+Focus on:
+- Critical bugs or logic errors
+- Performance improvements with clear impact
+- Security issues
+- Design improvements that make code more maintainable
+- Algorithm optimizations
+- Code intent and what it's trying to accomplish
+
+Skip minor issues. Only mention problems worth fixing and optimizations worth implementing."""
+
+
+class TechnicalReviewer:
+    def __init__(self):
+        self.llm = get_openai_llm()
+        # Native JSON-schema output: no format instructions in the prompt and no text re-parsing
+        self.structured_llm = self.llm.with_structured_output(CodeReview, method="json_schema")
+        self.batch_llm = self.llm.with_structured_output(CodeReviewBatch, method="json_schema")
+        # The system message never changes, so build it once
+        self._system_msg = SystemMessage(content=SYSTEM_PROMPT)
+
+    def build_messages(self, code: str) -> List[BaseMessage]:
+        return [self._system_msg, HumanMessage(content=HUMAN_TEMPLATE.format(code=code))]
+
+    def build_batch_messages(self, files: Dict[str, str]) -> List[BaseMessage]:
+        return [self._system_msg, HumanMessage(content=BATCH_HUMAN_TEMPLATE.format(files=format_files(files)))]
 
     def analyze(self, code: str) -> CodeReview:
         try:
-            response = self.llm.invoke(
-                self.prompt.format_messages(
-                    code=code,
-                    format_instructions=self.parser.get_format_instructions()
-                )
-            )
-            return self.parser.parse(response.content)
+            return self._invoke(code)
+        except Exception as e:
+            return self._failed_review(e)
+
+    def _invoke(self, code: str) -> CodeReview:
+        """Review one file, raising on failure instead of returning a failed review"""
+        return cached_invoke(
+            self.structured_llm,
+            self.build_messages(code),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+
+    def _invoke_batch(self, files: Dict[str, str]) -> Dict[str, CodeReview]:
+        batch = cached_invoke(
+            self.batch_llm,
+            self.build_batch_messages(files),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+        return {item.filename: item.review for item in batch.reviews}
+
+    def analyze_batch(self, files: Dict[str, str]) -> Dict[str, Union[CodeReview, Exception]]:
+        """Review several files in a single request; files whose review failed map to the exception"""
+        return run_batch(files, self._invoke_batch, self._invoke)
+
+    async def aanalyze(self, code: str) -> CodeReview:
+        """Async variant of analyze, so reviews can run concurrently"""
+        try:
+            return await self._ainvoke(code)
         except Exception as e:
-            return CodeReview(
-                language="unknown",
-                intent="Analysis failed - code may have syntax errors",
-                issues=[CodeIssue(
-                    severity="critical",
-                    location="Parser",
-                    problem=f"Could not analyze code: {str(e)}",
-                    solution="Fix syntax errors and retry",
-                    impact="Code analysis required for review"
-                )],
-                optimizations=[],
-                key_insights=["Manual code review needed due to parsing failure"]
-            )
+            return self._failed_review(e)
+
+    async def _ainvoke(self, code: str) -> CodeReview:
+        """Review one file, raising on failure instead of returning a failed review"""
+        return await acached_invoke(
+            self.structured_llm,
+            self.build_messages(code),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+
+    async def _ainvoke_batch(self, files: Dict[str, str]) -> Dict[str, CodeReview]:
+        batch = await acached_invoke(
+            self.batch_llm,
+            self.build_batch_messages(files),
+            model=self.llm.model_name,
+            temperature=self.llm.temperature
+        )
+        return {item.filename: item.review for item in batch.reviews}
+
+    async def aanalyze_batch(self, files: Dict[str, str]) -> Dict[str, Union[CodeReview, Exception]]:
+        """Async variant of analyze_batch"""
+        return await arun_batch(files, self._ainvoke_batch, self._ainvoke)
+
+    def _failed_review(self, e: Exception) -> CodeReview:
+        return CodeReview(
+            language="unknown",
+            intent="Analysis failed - code may have syntax errors",
+            issues=[CodeIssue(
+                severity="critical",
+                location="Parser",
+                problem=f"Could not analyze code: {str(e)}",
+                solution="Fix syntax errors and retry",
+                impact="Code analysis required for review"
+            )],
+            optimizations=[],
+            key_insights=["Manual code review needed due to parsing failure"]
+        )
 
     def generate_report(self, review: CodeReview) -> str:
         """Generate focused, actionable report"""
         if not review.issues and not review.optimizations and not review.key_insights:
             return f"## Code Review: {review.language}\n\n**Intent:** {review.intent}\n\n✅ **No significant issues found** - Code appears well-structured and efficient."
 
-        lines = [
-            f"## Code Review: {review.language}",
-            f"**Intent:** {review.intent}",
-            ""
-        ]
-
-        # Critical Issues First
-        critical_issues = [i for i in review.issues if i.severity == "critical"]
-        if critical_issues:
-            lines.extend(["### 🚨 Critical Issues", ""])
-            for issue in critical_issues:
-                lines.extend([
-                    f"**{issue.location}**",
-                    f"Problem: {issue.problem}",
-                    f"Fix: {issue.solution}",
-                    f"Impact: {issue.impact}",
-                    ""
-                ])
-
-        # High Priority Issues
-        high_issues = [i for i in review.issues if i.severity == "high"]
-        if high_issues:
-            lines.extend(["### ⚠️ Important Issues", ""])
-            for issue in high_issues:
-                lines.extend([
-                    f"**{issue.location}**",
-                    f"Problem: {issue.problem}",
-                    f"Fix: {issue.solution}",
-                    f"Impact: {issue.impact}",
-                    ""
-                ])
-
-        # Performance Optimizations
-        perf_opts = [o for o in review.optimizations if o.type == "performance"]
-        if perf_opts:
-            lines.extend(["### ⚡ Performance Improvements", ""])
-            for opt in perf_opts:
-                lines.extend([
-                    f"**Current:** {opt.current_approach}",
-                    f"**Better:** {opt.better_approach}",
-                    f"**Benefit:** {opt.benefit}",
-                    ""
-                ])
-
-        # Algorithm Optimizations
-        algo_opts = [o for o in review.optimizations if o.type == "algorithm"]
-        if algo_opts:
-            lines.extend(["### 🔄 Algorithm Improvements", ""])
-            for opt in algo_opts:
-                lines.extend([
-                    f"**Current:** {opt.current_approach}",
-                    f"**Better:** {opt.better_approach}",
-                    f"**Benefit:** {opt.benefit}",
-                    ""
-                ])
-
-        # Design Improvements
-        design_opts = [o for o in review.optimizations if o.type == "design"]
-        if design_opts:
-            lines.extend(["### 🏗️ Design Improvements", ""])
-            for opt in design_opts:
-                lines.extend([
-                    f"**Current:** {opt.current_approach}",
-                    f"**Better:** {opt.better_approach}",
-                    f"**Benefit:** {opt.benefit}",
-                    ""
-                ])
-
-        # Key Insights
-        if review.key_insights:
-            lines.extend(["### 💡 Key Insights", ""])
-            lines.extend([f"- {insight}" for insight in review.key_insights])
-
-        # Medium Priority Issues (only if space allows)
-        medium_issues = [i for i in review.issues if i.severity == "medium"]
-        if medium_issues and len(lines) < 50:  # Only show if report isn't too long
-            lines.extend(["", "### 📝 Additional Issues", ""])
-            for issue in medium_issues:
-                lines.extend([
-                    f"**{issue.location}:** {issue.problem}",
-                    f"Fix: {issue.solution}",
-                    ""
-                ])
-
-        return "\n".join(lines)
+        return "\n".join(_iter_review_lines(review))
+
+def _iter_issue_block(title: str, issues: List[CodeIssue]):
+    yield title
+    yield ""
+    for issue in issues:
+        yield f"**{issue.location}**"
+        yield f"Problem: {issue.problem}"
+        yield f"Fix: {issue.solution}"
+        yield f"Impact: {issue.impact}"
+        yield ""
+
+def _iter_optimization_block(title: str, optimizations: List[Optimization]):
+    yield title
+    yield ""
+    for opt in optimizations:
+        yield f"**Current:** {opt.current_approach}"
+        yield f"**Better:** {opt.better_approach}"
+        yield f"**Benefit:** {opt.benefit}"
+        yield ""
+
+def _iter_review_lines(review: CodeReview):
+    """Yield the markdown lines of a code review"""
+    yield f"## Code Review: {review.language}"
+    yield f"**Intent:** {review.intent}"
+    yield ""
+
+    # Bucket issues and optimizations in one pass each, capping every bucket
+    # so an over-long review can't bloat the prompts it is fed back into
+    issues_by_severity = defaultdict(list)
+    for issue in review.issues:
+        issues_by_severity[issue.severity].append(issue)
+    optimizations_by_type = defaultdict(list)
+    for opt in review.optimizations:
+        optimizations_by_type[opt.type].append(opt)
+
+    # Critical Issues First
+    critical_issues = issues_by_severity["critical"][:MAX_PER_SEVERITY]
+    if critical_issues:
+        yield from _iter_issue_block("### 🚨 Critical Issues", critical_issues)
+
+    # High Priority Issues
+    high_issues = issues_by_severity["high"][:MAX_PER_SEVERITY]
+    if high_issues:
+        yield from _iter_issue_block("### ⚠️ Important Issues", high_issues)
+
+    # Performance Optimizations
+    perf_opts = optimizations_by_type["performance"][:MAX_PER_SEVERITY]
+    if perf_opts:
+        yield from _iter_optimization_block("### ⚡ Performance Improvements", perf_opts)
+
+    # Algorithm Optimizations
+    algo_opts = optimizations_by_type["algorithm"][:MAX_PER_SEVERITY]
+    if algo_opts:
+        yield from _iter_optimization_block("### 🔄 Algorithm Improvements", algo_opts)
+
+    # Design Improvements
+    design_opts = optimizations_by_type["design"][:MAX_PER_SEVERITY]
+    if design_opts:
+        yield from _iter_optimization_block("### 🏗️ Design Improvements", design_opts)
+
+    # Key Insights
+    if review.key_insights:
+        yield "### 💡 Key Insights"
+        yield ""
+        for insight in review.key_insights[:MAX_PER_SEVERITY]:
+            yield f"- {insight}"
+
+    # Medium Priority Issues
+    medium_issues = issues_by_severity["medium"][:MAX_PER_SEVERITY]
+    if medium_issues:
+        yield ""
+        yield "### 📝 Additional Issues"
+        yield ""
+        for issue in medium_issues:
+            yield f"**{issue.location}:** {issue.problem}"
+            yield f"Fix: {issue.solution}"
+            yield ""
+
+@lru_cache(maxsize=1)
+def _reviewer() -> TechnicalReviewer:
+    """Process-wide reviewer, so every call reuses one client and connection pool"""
+    return TechnicalReviewer()
 
 def review_code(code_content: str) -> str:
     """Get focused, actionable code review"""
-    reviewer = TechnicalReviewer()
+    reviewer = _reviewer()
     review = reviewer.analyze(code_content)
     return reviewer.generate_report(review)
 
+async def areview_code(code_content: str) -> str:
+    """Async variant of review_code"""
+    reviewer = _reviewer()
+    review = await reviewer.aanalyze(code_content)
+    return reviewer.generate_report(review)
+
+def review_code_batch(files: Dict[str, str]) -> Dict[str, Union[str, Exception]]:
+    """Review several files with one LLM request (filename -> review report)
+
+    Files whose review failed map to the exception instead of a report, so callers
+    can tell a failure apart from a review and avoid caching it.
+    """
+    reviewer = _reviewer()
+    return render_results(reviewer.analyze_batch(files), reviewer.generate_report)
+
+async def areview_code_batch(files: Dict[str, str]) -> Dict[str, Union[str, Exception]]:
+    """Async variant of review_code_batch"""
+    reviewer = _reviewer()
+    return render_results(await reviewer.aanalyze_batch(files), reviewer.generate_report)
+
 def review_file(file_path: str) -> str:
     """Review code from a file path"""
     try:
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Protocol, Tuple
+
+
+class CacheBackend(Protocol):
+    """Storage interface used by LLMCache"""
+
+    def get(self, key: str) -> Optional[Any]: ...
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None: ...
+
+    def delete(self, key: str) -> None: ...
+
+
+class InMemoryLRUBackend:
+    """Thread-safe in-process LRU store with per-entry expiry"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+class LLMCache:
+    """Response cache for deterministic LLM calls, keyed on (model, messages, temperature)"""
+
+    def __init__(self, backend: Optional[CacheBackend] = None, ttl: Optional[float] = 3600):
+        self.backend = backend or InMemoryLRUBackend()
+        self.ttl = ttl
+        self.stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def cache_key(model: Optional[str], messages: List[Dict[str, Any]], temperature: float) -> str:
+        payload = json.dumps(
+            {"model": model, "messages": messages, "temperature": temperature},
+            sort_keys=True,
+            default=str
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.backend.get(key)
+        if value is None:
+            self.stats["misses"] += 1
+        else:
+            self.stats["hits"] += 1
+        return value
+
+    def set(self, key: str, value: Any) -> None:
+        self.backend.set(key, value, self.ttl)
+
+
+# Process-wide cache shared by all agents
+llm_cache = LLMCache()
+
+
+def _serialize_messages(messages: List[Any]) -> List[Dict[str, Any]]:
+    return [{"role": getattr(m, "type", "human"), "content": getattr(m, "content", m)}
+            for m in messages]
+
+
+def _cache_key_for(llm: Any, messages: List[Any], model: Optional[str],
+                   temperature: Optional[float]) -> Optional[str]:
+    """Return the cache key, or None when the call is not deterministic"""
+    if model is None:
+        model = getattr(llm, "model_name", None) or getattr(llm, "model", None)
+    if temperature is None:
+        temperature = getattr(llm, "temperature", None)
+    if temperature is None or temperature > 0:
+        return None
+    return LLMCache.cache_key(model, _serialize_messages(messages), temperature)
+
+
+def cached_invoke(llm: Any, messages: List[Any], model: Optional[str] = None,
+                  temperature: Optional[float] = None, cache: Optional[LLMCache] = None) -> Any:
+    """Invoke llm, serving temperature-0 calls from the cache"""
+    cache = cache or llm_cache
+    key = _cache_key_for(llm, messages, model, temperature)
+    if key is None:
+        return llm.invoke(messages)
+
+    response = cache.get(key)
+    if response is None:
+        response = llm.invoke(messages)
+        cache.set(key, response)
+    return response
+
+
+async def acached_invoke(llm: Any, messages: List[Any], model: Optional[str] = None,
+                         temperature: Optional[float] = None, cache: Optional[LLMCache] = None) -> Any:
+    """Async variant of cached_invoke"""
+    cache = cache or llm_cache
+    key = _cache_key_for(llm, messages, model, temperature)
+    if key is None:
+        return await llm.ainvoke(messages)
+
+    response = cache.get(key)
+    if response is None:
+        response = await llm.ainvoke(messages)
+        cache.set(key, response)
+    return response
@@ -0,0 +1,22 @@
+from functools import lru_cache
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+# One keep-alive pool for every gpt-4o request in the process
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20, max_connections=100)
+
+
+@lru_cache(maxsize=1)
+def get_openai_llm() -> ChatOpenAI:
+    """Shared gpt-4o client used by the review and bug agents
+
+    Sync calls (invoke/batch, including from worker threads) go through the sync pool;
+    only async callers use the async pool, always on their own event loop.
+    """
+    return ChatOpenAI(
+        model="gpt-4o",
+        temperature=0,
+        http_client=httpx.Client(limits=_HTTP_LIMITS),
+        http_async_client=httpx.AsyncClient(limits=_HTTP_LIMITS)
+    )
@@ -0,0 +1,66 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Union
+
+
+def format_files(files: Dict[str, str]) -> str:
+    """Pack several files into one prompt, each under its own === name === header"""
+    return "\n\n".join(f"=== {name} ===\n```\n{content}\n```" for name, content in files.items())
+
+
+def run_batch(files: Dict[str, str],
+              invoke_batch: Callable[[Dict[str, str]], Dict[str, Any]],
+              invoke_one: Callable[[str], Any]) -> Dict[str, Union[Any, Exception]]:
+    """Analyze files with one batched request (filename -> result), in input order
+
+    A single file skips the batch prompt; files the model left out of the batch are
+    analyzed on their own. Files whose analysis failed map to the exception.
+    """
+    if len(files) == 1:
+        (name, content), = files.items()
+        try:
+            return {name: invoke_one(content)}
+        except Exception as e:
+            return {name: e}
+    
+    try:
+        results = invoke_batch(files)
+    except Exception as e:
+        return {name: e for name in files}
+    
+    for name in files:
+        if name not in results:
+            try:
+                results[name] = invoke_one(files[name])
+            except Exception as e:
+                results[name] = e
+    return {name: results[name] for name in files}
+
+
+async def arun_batch(files: Dict[str, str],
+                     ainvoke_batch: Callable[[Dict[str, str]], Awaitable[Dict[str, Any]]],
+                     ainvoke_one: Callable[[str], Awaitable[Any]]) -> Dict[str, Union[Any, Exception]]:
+    """Async variant of run_batch; left-out files are analyzed concurrently"""
+    if len(files) == 1:
+        (name, content), = files.items()
+        try:
+            return {name: await ainvoke_one(content)}
+        except Exception as e:
+            return {name: e}
+    
+    try:
+        results = await ainvoke_batch(files)
+    except Exception as e:
+        return {name: e for name in files}
+    
+    missing = [name for name in files if name not in results]
+    if missing:
+        solo_results = await asyncio.gather(*[ainvoke_one(files[name]) for name in missing],
+                                            return_exceptions=True)
+        results.update(zip(missing, solo_results))
+    return {name: results[name] for name in files}
+
+
+def render_results(results: Dict[str, Any], render: Callable[[Any], str]) -> Dict[str, Union[str, Exception]]:
+    """Render every successful result to its report, passing exceptions through"""
+    return {name: result if isinstance(result, BaseException) else render(result)
+            for name, result in results.items()}
@@ -1,16 +1,179 @@
 import os
+import hashlib
 import json
-from typing import List, Optional, Dict, Any
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Iterator, Tuple, Union
+from itertools import islice
 from pydantic import BaseModel, Field
-from langchain.chat_models import ChatOpenAI
-from langchain.prompts import ChatPromptTemplate
-from langchain.schema import HumanMessage, SystemMessage
-from langchain.output_parsers import PydanticOutputParser
+from langchain_openai import ChatOpenAI
+from langchain.schema import BaseMessage, HumanMessage, SystemMessage
 from dotenv import load_dotenv
 import glob
+from concurrent.futures import ThreadPoolExecutor
+from classify import classify_entry
 
 load_dotenv()
 
+# Files with this many bytes (or decoded characters) or more are not included in the prompt
+MAX_FILE_CHARS = 10000
+
+# Hidden directories are skipped as well
+SKIP_DIRS = frozenset({'node_modules', '__pycache__', 'venv', 'env', 'build', 'dist'})
+
+READ_WORKERS = min(32, (os.cpu_count() or 4) * 4)
+
+# Repositories scanned at once by generate_readme_contents (each scan has its own read pool)
+REPO_SCAN_WORKERS = 4
+
+# How many files, and how many characters of each, the analysis prompt includes
+PROMPT_MAX_FILES = 20
+PROMPT_FILE_CHARS = 1000
+
+# Structured calls made before giving up on a repository whose tool call comes back unparsed
+GENERATION_ATTEMPTS = 2
+
+def _iter_entries(path: str) -> Iterator[os.DirEntry]:
+    """Yield non-hidden files under path in os.walk order, reusing scandir's cached entry types"""
+    subdirs = []
+    try:
+        entries = os.scandir(path)
+    except OSError:
+        return  # Unreadable directories are skipped, as os.walk does
+    # Bound to locals: this loop runs once per directory entry in the repository
+    skip_dirs = SKIP_DIRS
+    add_subdir = subdirs.append
+    with entries:
+        for entry in entries:
+            name = entry.name
+            if name[:1] == '.':
+                continue
+            # Symlinked directories are not followed, matching os.walk's default
+            if entry.is_dir(follow_symlinks=False):
+                if name not in skip_dirs:
+                    add_subdir(entry.path)
+            elif entry.is_file():
+                yield entry
+    for subdir in subdirs:
+        yield from _iter_entries(subdir)
+
+# Generated README content, keyed by repository fingerprint
+README_CACHE_DIR = os.path.expanduser("~/.cache/readme_gen")
+# Bump when the prompt layout in create_analysis_prompt or the generation settings change;
+# the prompt constants and the ReadmeContent schema are hashed into the fingerprint already
+CACHE_VERSION = 1
+
+@lru_cache(maxsize=1)
+def _generation_digest() -> bytes:
+    """Digest of everything besides the repository that shapes a generated README"""
+    hasher = hashlib.blake2b(digest_size=24)
+    for part in (str(CACHE_VERSION), README_SYSTEM_PROMPT, README_INSTRUCTIONS,
+                 json.dumps(ReadmeContent.model_json_schema(), sort_keys=True)):
+        hasher.update(part.encode())
+        hasher.update(b"\0")
+    return hasher.digest()
+
+def repo_fingerprint(repo_data: Dict[str, Any], model: str) -> str:
+    """Hash of the prompt/schema version, the repository listing and every included file's content"""
+    # Fields are streamed into one hasher NUL-separated (NUL never occurs in paths),
+    # so no JSON document has to be built and encoded just to be hashed; contents
+    # are length-prefixed, which keeps the stream unambiguous without per-file digests
+    hasher = hashlib.blake2b(digest_size=24)
+    hasher.update(_generation_digest())
+    hasher.update(model.encode())
+    hasher.update(b"\0")
+    for path in sorted(repo_data["structure"]):
+        hasher.update(path.encode())
+        hasher.update(b"\0")
+    hasher.update(b"\0")
+    for path, info in sorted(repo_data["files"].items()):
+        hasher.update(path.encode())
+        hasher.update(b"\0")
+        content = info["content"].encode()
+        hasher.update(len(content).to_bytes(8, "little"))
+        hasher.update(content)
+    return hasher.hexdigest()
+
+def _read_text(file_path: str, max_chars: int) -> Optional[Tuple[str, int]]:
+    """Return (first max_chars characters, total length), or None if the file is too large"""
+    # One raw read on a bare descriptor: for files this small, building a buffered
+    # text wrapper per file costs more than the read itself
+    try:
+        fd = os.open(file_path, os.O_RDONLY)
+        try:
+            data = os.read(fd, MAX_FILE_CHARS)
+        finally:
+            os.close(fd)
+    except Exception as e:
+        print(f"Error reading {file_path}: {e}")
+        return None
+    if len(data) >= MAX_FILE_CHARS:  # Limit file size to avoid token limits
+        return None
+    # Same result as text mode: undecodable bytes dropped, universal newlines
+    content = data.decode('utf-8', errors='ignore').replace('\r\n', '\n').replace('\r', '\n')
+    return content[:max_chars], len(content)
+
+def _iter_file_contents(to_read: List[Tuple[str, str, str]], max_chars: int) -> Iterator[Tuple[str, str, Tuple[str, int]]]:
+    """Yield (relative_path, extension, (content, size)) in order, reading one pool-sized batch at a time"""
+    # Reads are independent and I/O-bound, so each batch runs on a thread pool;
+    # map() keeps results in walk order
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        for start in range(0, len(to_read), READ_WORKERS):
+            batch = to_read[start:start + READ_WORKERS]
+            results = executor.map(_read_text, [file_path for _, file_path, _ in batch], [max_chars] * len(batch))
+            for (relative_path, _, file_ext), result in zip(batch, results):
+                if result is not None:
+                    yield relative_path, file_ext, result
+
+# README generation prompt; kept constant so its tokens form a cacheable prefix
+README_SYSTEM_PROMPT = "You are an expert technical writer who creates comprehensive, professional README files for software projects."
+
+README_INSTRUCTIONS = """Analyze the repository described at the end of this message and generate a comprehensive README structure that includes:
+
+1. **Project Title & Description**: Create an engaging title and both short/detailed descriptions
+2. **Features**: Identify key features and functionalities from the code
+3. **Tech Stack**: Categorize all technologies used (Frontend, Backend, Database, Tools, etc.)
+4. **Architecture Overview**: 
+   - Analyze the system architecture based on file structure and code
+   - Create a simple ASCII diagram showing component relationships
+   - Describe data flow between components
+   - Explain deployment architecture
+5. **Prerequisites**: What users need before installation
+6. **Installation Steps**: Detailed step-by-step installation guide
+7. **Usage Examples**: Practical code examples showing how to use the project
+8. **Deployment Options**: 
+   - Generate deployment guides for the detected platforms listed with the repository (Docker, Heroku, etc. if none are detected)
+   - Include environment-specific steps
+   - List required configuration files
+9. **Project Structure**: Explain important files and directories
+10. **Environment Variables**: List required environment variables from config files
+11. **API Endpoints**: If it's a web service, list main endpoints
+12. **Contributing Guidelines**: How others can contribute
+13. **License & Contact**: License info and author contact
+14. **Acknowledgments**: Credits and thanks
+
+Special instructions for new features:
+
+**DEPLOYMENT GUIDE**: 
+- Analyze detected deployment configs and generate platform-specific instructions
+- Include prerequisites, step-by-step deployment, and environment notes
+- Cover multiple deployment scenarios (development, staging, production)
+
+**ARCHITECTURE OVERVIEW**:
+- Create a text-based architecture diagram using ASCII characters
+- Identify system components (frontend, backend, database, APIs, etc.)
+- Describe how components interact and data flows
+- Explain the overall system design and patterns used
+
+Make sure to:
+- Infer the project purpose from file contents and structure
+- Provide programming-language-agnostic installation instructions where possible
+- Include realistic code examples based on actual code found
+- Be specific about dependencies and requirements
+- Make it beginner-friendly but comprehensive
+- Generate deployment instructions based on detected configuration files
+- Create clear architecture explanations that help developers understand the system
+"""
+
 # Pydantic Models for Structured Output
 class Feature(BaseModel):
     """Individual feature of the project"""
@@ -87,23 +250,58 @@ class ReadmeContent(BaseModel):
     acknowledgments: List[str] = Field(description="Credits and acknowledgments")
 
 class ReadmeGenerator:
-    def __init__(self, openai_api_key: str = None):
-        """Initialize the README generator"""
+    def __init__(self, openai_api_key: str = None, cache_dir: Optional[str] = README_CACHE_DIR):
+        """Initialize the README generator (cache_dir=None disables the result cache)"""
         self.api_key = openai_api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required")
         
         self.llm = ChatOpenAI(
             openai_api_key=self.api_key,
-            model="gpt-4",
+            model="gpt-4o-mini",
             temperature=0.3
         )
         
-        # Set up the output parser
-        self.parser = PydanticOutputParser(pydantic_object=ReadmeContent)
+        # Tool-call output is parsed straight into ReadmeContent: no format
+        # instructions in the prompt and no text re-parsing
+        self.structured_llm = self.llm.with_structured_output(ReadmeContent, method="function_calling")
+        
+        # The system message never changes, so build it once
+        self._system_msg = SystemMessage(content=README_SYSTEM_PROMPT)
+        
+        self.cache_dir = cache_dir
+    
+    def _cache_path(self, fingerprint: str) -> str:
+        return os.path.join(self.cache_dir, f"{fingerprint}.json")
     
-    def scan_repository(self, repo_path: str) -> Dict[str, Any]:
-        """Scan repository and extract file contents"""
+    def _load_cached_content(self, fingerprint: str) -> Optional[ReadmeContent]:
+        if not self.cache_dir:
+            return None
+        try:
+            with open(self._cache_path(fingerprint), 'r', encoding='utf-8') as f:
+                return ReadmeContent.model_validate_json(f.read())
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            print(f"Ignoring unreadable cache entry {fingerprint}: {e}")
+            return None
+    
+    def _store_cached_content(self, fingerprint: str, content: ReadmeContent) -> None:
+        # Only parsed content is cached; a missing result must never be replayed
+        if not self.cache_dir or not isinstance(content, ReadmeContent):
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = self._cache_path(fingerprint) + ".tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content.model_dump_json())
+            os.replace(tmp_path, self._cache_path(fingerprint))
+        except Exception as e:
+            print(f"Could not cache README content: {e}")
+    
+    def scan_repository(self, repo_path: str, max_files: int = PROMPT_MAX_FILES,
+                        max_chars_per_file: int = PROMPT_FILE_CHARS) -> Dict[str, Any]:
+        """Scan repository and extract the (truncated) contents of the files used in the prompt"""
         repo_data = {
             "files": {},
             "structure": [],
@@ -113,87 +311,45 @@ class ReadmeGenerator:
             "architecture_indicators": {}
         }
         
-        # Common file extensions to analyze
-        code_extensions = {'.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.cpp', '.c', '.cs', '.go', '.rs', '.php', '.rb', '.swift', '.kt'}
-        config_extensions = {'.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf'}
-        doc_extensions = {'.md', '.txt', '.rst', '.org'}
-        
-        # Deployment configuration files to detect
-        deployment_files = {
-            'Dockerfile': 'docker',
-            'docker-compose.yml': 'docker-compose',
-            'docker-compose.yaml': 'docker-compose',
-            'Procfile': 'heroku',
-            'vercel.json': 'vercel',
-            'netlify.toml': 'netlify',
-            '.platform.app.yaml': 'platform.sh',
-            'app.yaml': 'gcp',
-            'appspec.yml': 'aws-codedeploy',
-            'buildspec.yml': 'aws-codebuild',
-            'azure-pipelines.yml': 'azure',
-            'cloudbuild.yaml': 'gcp-cloudbuild',
-            'railway.json': 'railway',
-            'render.yaml': 'render'
-        }
-        
-        # Architecture indicator files
-        architecture_files = {
-            'microservices': ['docker-compose.yml', 'kubernetes/', 'k8s/', 'helm/'],
-            'monolith': ['main.py', 'app.py', 'index.js', 'server.js'],
-            'frontend': ['package.json', 'src/', 'public/', 'components/', 'pages/'],
-            'backend': ['api/', 'routes/', 'models/', 'controllers/', 'services/'],
-            'database': ['migrations/', 'schema.sql', 'models.py', 'entity/', 'repositories/'],
-            'mobile': ['android/', 'ios/', 'flutter/', 'react-native/', 'xamarin/'],
-            'ml': ['models/', 'notebooks/', 'data/', 'train.py', 'predict.py']
-        }
-        
-        for root, dirs, files in os.walk(repo_path):
-            # Skip hidden directories and common build/cache directories
-            dirs[:] = [d for d in dirs if not d.startswith('.') and d not in ['node_modules', '__pycache__', 'venv', 'env', 'build', 'dist']]
+        to_read = []  # (relative_path, file_path, extension) of files to include
+        for entry in _iter_entries(repo_path):
+            file = entry.name
+            file_path = entry.path
+            relative_path = os.path.relpath(file_path, repo_path)
             
-            for file in files:
-                if file.startswith('.'):
-                    continue
-                    
-                file_path = os.path.join(root, file)
-                relative_path = os.path.relpath(file_path, repo_path)
-                
-                file_ext = os.path.splitext(file)[1].lower()
-                repo_data["file_types"].add(file_ext)
-                repo_data["total_files"] += 1
-                
-                # Check for deployment configurations
-                if file in deployment_files:
-                    repo_data["deployment_configs"][deployment_files[file]] = relative_path
-                
-                # Check for architecture indicators
-                for arch_type, indicators in architecture_files.items():
-                    for indicator in indicators:
-                        if indicator in relative_path.lower() or file.lower() == indicator:
-                            if arch_type not in repo_data["architecture_indicators"]:
-                                repo_data["architecture_indicators"][arch_type] = []
-                            repo_data["architecture_indicators"][arch_type].append(relative_path)
-                
-                # Read file content for important files
-                if (file_ext in code_extensions or 
-                    file_ext in config_extensions or 
-                    file_ext in doc_extensions or
-                    file.lower() in ['readme.md', 'package.json', 'requirements.txt', 'dockerfile', 'makefile'] or
-                    file in deployment_files):
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                            content = f.read()
-                            if len(content) < 10000:  # Limit file size to avoid token limits
-                                repo_data["files"][relative_path] = {
-                                    "content": content,
-                                    "size": len(content),
-                                    "extension": file_ext
-                                }
-                    except Exception as e:
-                        print(f"Error reading {file_path}: {e}")
+            file_ext, deployment_platform, arch_types, should_read = classify_entry(file, relative_path)
+            repo_data["file_types"].add(file_ext)
+            repo_data["total_files"] += 1
+            
+            # Check for deployment configurations
+            if deployment_platform:
+                repo_data["deployment_configs"][deployment_platform] = relative_path
+            
+            # Check for architecture indicators
+            for arch_type in arch_types:
+                repo_data["architecture_indicators"].setdefault(arch_type, []).append(relative_path)
+            
+            # Read file content for important files
+            if should_read:
                 
-                repo_data["structure"].append(relative_path)
+                try:
+                    # Oversized files are rejected from the stat scandir already did,
+                    # before any open(); the bounded read in _read_text stays as a safety net
+                    if entry.stat().st_size < MAX_FILE_CHARS:
+                        to_read.append((relative_path, file_path, file_ext))
+                except Exception as e:
+                    print(f"Error reading {file_path}: {e}")
+            
+            repo_data["structure"].append(relative_path)
+        
+        # Only the first max_files readable files reach the prompt, so stop reading once they're found
+        for relative_path, file_ext, (content, size) in islice(
+                _iter_file_contents(to_read, max_chars_per_file), max_files):
+            repo_data["files"][relative_path] = {
+                "content": content,
+                "size": size,
+                "extension": file_ext
+            }
         
         repo_data["file_types"] = list(repo_data["file_types"])
         return repo_data
@@ -208,8 +364,8 @@ class ReadmeGenerator:
         
         # Summarize file contents
         files_summary = ""
-        for file_path, file_info in list(repo_data["files"].items())[:20]:  # Limit to first 20 files
-            files_summary += f"\n--- {file_path} ---\n{file_info['content'][:1000]}\n"
+        for file_path, file_info in islice(repo_data["files"].items(), PROMPT_MAX_FILES):
+            files_summary += f"\n--- {file_path} ---\n{file_info['content'][:PROMPT_FILE_CHARS]}\n"
         
         # Deployment configurations summary
         deployment_summary = ""
@@ -225,12 +381,15 @@ class ReadmeGenerator:
             for arch_type, files in repo_data["architecture_indicators"].items():
                 architecture_summary += f"- {arch_type.upper()}: {', '.join(files[:3])}\n"
         
-        prompt = f"""
-Analyze the following repository and generate a comprehensive README.md content.
-
+        detected_platforms = ', '.join(repo_data['deployment_configs'].keys()) if repo_data['deployment_configs'] else 'none'
+        
+        # Static instructions first and repository details last, so the shared
+        # prefix is identical across calls and eligible for prompt caching
+        prompt = f"""{README_INSTRUCTIONS}
 REPOSITORY STATISTICS:
 - Total files: {repo_data['total_files']}
 - File types found: {', '.join(repo_data['file_types'])}
+- Deployment platforms detected: {detected_platforms}
 
 PROJECT STRUCTURE:
 {structure_summary}
@@ -241,89 +400,84 @@ PROJECT STRUCTURE:
 
 FILE CONTENTS:
 {files_summary}
-
-Based on this repository analysis, generate a comprehensive README structure that includes:
-
-1. **Project Title & Description**: Create an engaging title and both short/detailed descriptions
-2. **Features**: Identify key features and functionalities from the code
-3. **Tech Stack**: Categorize all technologies used (Frontend, Backend, Database, Tools, etc.)
-4. **Architecture Overview**: 
-   - Analyze the system architecture based on file structure and code
-   - Create a simple ASCII diagram showing component relationships
-   - Describe data flow between components
-   - Explain deployment architecture
-5. **Prerequisites**: What users need before installation
-6. **Installation Steps**: Detailed step-by-step installation guide
-7. **Usage Examples**: Practical code examples showing how to use the project
-8. **Deployment Options**: 
-   - Generate deployment guides for detected platforms ({', '.join(repo_data['deployment_configs'].keys()) if repo_data['deployment_configs'] else 'Docker, Heroku, etc.'})
-   - Include environment-specific steps
-   - List required configuration files
-9. **Project Structure**: Explain important files and directories
-10. **Environment Variables**: List required environment variables from config files
-11. **API Endpoints**: If it's a web service, list main endpoints
-12. **Contributing Guidelines**: How others can contribute
-13. **License & Contact**: License info and author contact
-14. **Acknowledgments**: Credits and thanks
-
-Special instructions for new features:
-
-**DEPLOYMENT GUIDE**: 
-- Analyze detected deployment configs and generate platform-specific instructions
-- Include prerequisites, step-by-step deployment, and environment notes
-- Cover multiple deployment scenarios (development, staging, production)
-
-**ARCHITECTURE OVERVIEW**:
-- Create a text-based architecture diagram using ASCII characters
-- Identify system components (frontend, backend, database, APIs, etc.)
-- Describe how components interact and data flows
-- Explain the overall system design and patterns used
-
-Make sure to:
-- Infer the project purpose from file contents and structure
-- Provide programming-language-agnostic installation instructions where possible
-- Include realistic code examples based on actual code found
-- Be specific about dependencies and requirements
-- Make it beginner-friendly but comprehensive
-- Generate deployment instructions based on detected configuration files
-- Create clear architecture explanations that help developers understand the system
-
-{self.parser.get_format_instructions()}
 """
         return prompt
     
+    def _build_messages(self, repo_data: Dict[str, Any]) -> List[BaseMessage]:
+        prompt = self.create_analysis_prompt(repo_data)
+        return [self._system_msg, HumanMessage(content=prompt)]
+    
     def generate_readme_content(self, repo_path: str) -> ReadmeContent:
         """Generate README content from repository analysis"""
         print("Scanning repository...")
         repo_data = self.scan_repository(repo_path)
         
+        # Unchanged repositories reuse the previous generation instead of calling the LLM
+        fingerprint = repo_fingerprint(repo_data, self.llm.model_name)
+        cached = self._load_cached_content(fingerprint)
+        if cached is not None:
+            print("Using cached README content...")
+            return cached
+        
         print("Creating analysis prompt...")
-        prompt = self.create_analysis_prompt(repo_data)
+        messages = self._build_messages(repo_data)
         
         print("Generating README content with LangChain...")
         
-        # Create chat prompt template
-        chat_prompt = ChatPromptTemplate.from_messages([
-            SystemMessage(content="You are an expert technical writer who creates comprehensive, professional README files for software projects."),
-            HumanMessage(content=prompt)
-        ])
-        
         # Generate content using LangChain
-        response = self.llm(chat_prompt.format_messages())
+        readme_content = self._invoke_structured(messages)
+        self._store_cached_content(fingerprint, readme_content)
+        return readme_content
+    
+    def _invoke_structured(self, messages: List[BaseMessage]) -> ReadmeContent:
+        """Run the structured call, retrying when no parsable tool call comes back"""
+        for attempt in range(1, GENERATION_ATTEMPTS + 1):
+            readme_content = self.structured_llm.invoke(messages)
+            if isinstance(readme_content, ReadmeContent):
+                return readme_content
+            print(f"No README content parsed from the model response (attempt {attempt}/{GENERATION_ATTEMPTS})")
+        raise ValueError("Model returned no parsable README content")
+    
+    def generate_readme_contents(self, repo_paths: List[str]) -> List[Union[ReadmeContent, Exception]]:
+        """Generate README content for several repositories, sending their LLM calls as one batch
+
+        A repository whose generation failed gets the exception in its slot, so one
+        failure does not discard the others.
+        """
+        print(f"Scanning {len(repo_paths)} repositories...")
+        with ThreadPoolExecutor(max_workers=max(1, min(len(repo_paths), REPO_SCAN_WORKERS))) as executor:
+            all_repo_data = list(executor.map(self.scan_repository, repo_paths))
+        
+        fingerprints = [repo_fingerprint(repo_data, self.llm.model_name) for repo_data in all_repo_data]
+        contents = [self._load_cached_content(fingerprint) for fingerprint in fingerprints]
+        pending = [i for i, content in enumerate(contents) if content is None]
+        
+        if pending:
+            print(f"Generating README content for {len(pending)} repositories with LangChain...")
+            # batch() runs the requests concurrently instead of one round-trip after another
+            generated = self.structured_llm.batch([self._build_messages(all_repo_data[i]) for i in pending],
+                                                  return_exceptions=True)
+            for i, content in zip(pending, generated):
+                if not isinstance(content, ReadmeContent):
+                    # The call failed or came back unparsed; retry this repository on its own
+                    try:
+                        content = self._invoke_structured(self._build_messages(all_repo_data[i]))
+                    except Exception as e:
+                        print(f"❌ Error generating README content for {repo_paths[i]}: {e}")
+                        contents[i] = e
+                        continue
+                contents[i] = content
+                self._store_cached_content(fingerprints[i], contents[i])
         
-        # Parse the response using Pydantic
-        try:
-            readme_content = self.parser.parse(response.content)
-            return readme_content
-        except Exception as e:
-            print(f"Error parsing response: {e}")
-            print("Raw response:", response.content)
-            raise
+        return contents
     
     def format_readme_markdown(self, content: ReadmeContent) -> str:
         """Convert ReadmeContent to formatted Markdown"""
         
-        markdown = f"""# {content.project_title}
+        # Collect pieces and join once instead of re-concatenating a growing string
+        buf = []
+        w = buf.append
+        w(f"""# {content.project_title}
 
 {content.short_description}
 
@@ -333,107 +487,107 @@ Make sure to:
 
 ## ✨ Features
 
-"""
+""")
         
         for feature in content.features:
-            markdown += f"- **{feature.title}**: {feature.description}\n"
+            w(f"- **{feature.title}**: {feature.description}\n")
         
-        markdown += "\n## 🛠️ Tech Stack\n\n"
+        w("\n## 🛠️ Tech Stack\n\n")
         
         for tech_category in content.tech_stack:
-            markdown += f"**{tech_category.category}:**\n"
+            w(f"**{tech_category.category}:**\n")
             for tech in tech_category.technologies:
-                markdown += f"- {tech}\n"
-            markdown += "\n"
+                w(f"- {tech}\n")
+            w("\n")
         
-        markdown += "## 📋 Prerequisites\n\n"
+        w("## 📋 Prerequisites\n\n")
         for prereq in content.prerequisites:
-            markdown += f"- {prereq}\n"
+            w(f"- {prereq}\n")
         
-        markdown += "\n## 🚀 Installation\n\n"
+        w("\n## 🚀 Installation\n\n")
         for step in content.installation_steps:
-            markdown += f"### {step.step_number}. {step.title}\n\n"
+            w(f"### {step.step_number}. {step.title}\n\n")
             if step.commands:
-                markdown += "```bash\n"
+                w("```bash\n")
                 for cmd in step.commands:
-                    markdown += f"{cmd}\n"
-                markdown += "```\n\n"
+                    w(f"{cmd}\n")
+                w("```\n\n")
             if step.description:
-                markdown += f"{step.description}\n\n"
+                w(f"{step.description}\n\n")
         
         # Deployment Options Section
         if content.deployment_options:
-            markdown += "## 🚀 Deployment\n\n"
+            w("## 🚀 Deployment\n\n")
             
             for deployment in content.deployment_options:
-                markdown += f"### {deployment.title}\n\n"
+                w(f"### {deployment.title}\n\n")
                 
                 if deployment.prerequisites:
-                    markdown += "**Prerequisites:**\n"
+                    w("**Prerequisites:**\n")
                     for prereq in deployment.prerequisites:
-                        markdown += f"- {prereq}\n"
-                    markdown += "\n"
+                        w(f"- {prereq}\n")
+                    w("\n")
                 
                 if deployment.config_files:
-                    markdown += "**Required Files:**\n"
+                    w("**Required Files:**\n")
                     for config_file in deployment.config_files:
-                        markdown += f"- `{config_file}`\n"
-                    markdown += "\n"
+                        w(f"- `{config_file}`\n")
+                    w("\n")
                 
-                markdown += "**Steps:**\n"
+                w("**Steps:**\n")
                 for i, step in enumerate(deployment.steps, 1):
-                    markdown += f"{i}. {step}\n"
-                markdown += "\n"
+                    w(f"{i}. {step}\n")
+                w("\n")
                 
                 if deployment.environment_notes:
-                    markdown += f"**Environment Notes:** {deployment.environment_notes}\n\n"
+                    w(f"**Environment Notes:** {deployment.environment_notes}\n\n")
                 
-                markdown += "---\n\n"
+                w("---\n\n")
         
-        markdown += "## 💡 Usage\n\n"
+        w("## 💡 Usage\n\n")
         for example in content.usage_examples:
-            markdown += f"### {example.title}\n\n{example.description}\n\n"
-            markdown += f"```{example.language}\n{example.code}\n```\n\n"
+            w(f"### {example.title}\n\n{example.description}\n\n")
+            w(f"```{example.language}\n{example.code}\n```\n\n")
         
-        markdown += "## 📁 Project Structure\n\n"
-        markdown += "```\n"
+        w("## 📁 Project Structure\n\n")
+        w("```\n")
         for item in content.project_structure:
-            markdown += f"{item.path}\n"
-        markdown += "```\n\n"
+            w(f"{item.path}\n")
+        w("```\n\n")
         
         for item in content.project_structure:
-            markdown += f"- **{item.path}**: {item.description}\n"
+            w(f"- **{item.path}**: {item.description}\n")
         
         if content.environment_variables:
-            markdown += "\n## 🔧 Environment Variables\n\n"
-            markdown += "Create a `.env` file in the root directory with the following variables:\n\n"
-            markdown += "```env\n"
+            w("\n## 🔧 Environment Variables\n\n")
+            w("Create a `.env` file in the root directory with the following variables:\n\n")
+            w("```env\n")
             for env_var in content.environment_variables:
-                markdown += f"{env_var}\n"
-            markdown += "```\n\n"
+                w(f"{env_var}\n")
+            w("```\n\n")
         
         if content.api_endpoints:
-            markdown += "## 🌐 API Endpoints\n\n"
+            w("## 🌐 API Endpoints\n\n")
             for endpoint in content.api_endpoints:
-                markdown += f"- {endpoint}\n"
-            markdown += "\n"
+                w(f"- {endpoint}\n")
+            w("\n")
         
-        markdown += "## 🤝 Contributing\n\n"
+        w("## 🤝 Contributing\n\n")
         for guideline in content.contributing_guidelines:
-            markdown += f"- {guideline}\n"
+            w(f"- {guideline}\n")
         
-        markdown += f"\n## 📄 License\n\n{content.license_info}\n\n"
-        markdown += f"## 👤 Author\n\n{content.author_contact}\n\n"
+        w(f"\n## 📄 License\n\n{content.license_info}\n\n")
+        w(f"## 👤 Author\n\n{content.author_contact}\n\n")
         
         if content.acknowledgments:
-            markdown += "## 🙏 Acknowledgments\n\n"
+            w("## 🙏 Acknowledgments\n\n")
             for ack in content.acknowledgments:
-                markdown += f"- {ack}\n"
+                w(f"- {ack}\n")
         
-        markdown += "\n---\n\n"
-        markdown += "⭐ Don't forget to star this repository if you found it helpful!\n"
+        w("\n---\n\n")
+        w("⭐ Don't forget to star this repository if you found it helpful!\n")
         
-        return markdown
+        return "".join(buf)
     
     def generate_readme(self, repo_path: str, output_path: str = "README.md") -> str:
         """Generate complete README file"""
@@ -5,35 +5,70 @@ Script to inspect what's stored in Redis Cloud
 
 import redis
 import json
-from redis_imple import RedisRepoStorage
+from redis_imple import RedisRepoStorage, get_storage
 
-def inspect_redis_contents():
+# Keys requested per SCAN step, and commands sent per pipeline round-trip
+SCAN_COUNT = 500
+PIPELINE_BATCH = 500
+
+# Key marker -> command whose reply summarizes that key, checked in order
+SUMMARY_COMMANDS = (
+    (":repos:list", "smembers"),
+    (":metadata", "hgetall"),
+    (":files:meta", "hlen"),
+    (":files", "hlen"),
+    (":blobs", "hlen"),
+    (":structure", "strlen"),
+)
+
+def _summary_command(key: str):
+    for marker, command in SUMMARY_COMMANDS:
+        if marker in key:
+            return command
+    return None
+
+def inspect_redis_contents(storage: RedisRepoStorage = None):
     """Show all data stored in Redis Cloud"""
     
     print("🔍 Inspecting Redis Cloud Contents")
     print("=" * 50)
     
     try:
-        storage = RedisRepoStorage()
-        
-        # Get all keys in Redis
-        all_keys = storage.redis_client.keys("*")
-        print(f"📊 Total keys in Redis: {len(all_keys)}")
+        storage = storage or get_storage()
         
-        if not all_keys:
+        # SCAN walks the keyspace incrementally instead of blocking the server like KEYS
+        user_keys = {}
+        total_keys = 0
+        for key in storage.redis_client.scan_iter(match="user:*", count=SCAN_COUNT):
+            total_keys += 1
+            parts = key.split(":")
+            if len(parts) >= 2:
+                user_id = parts[1]
+                if user_id not in user_keys:
+                    user_keys[user_id] = []
+                user_keys[user_id].append(key)
+        print(f"📊 Total user keys in Redis: {total_keys}")
+        
+        if not total_keys:
             print("❌ No data found in Redis Cloud")
             return
         
-        # Group keys by type
-        user_keys = {}
-        for key in all_keys:
-            if key.startswith("user:"):
-                parts = key.split(":")
-                if len(parts) >= 2:
-                    user_id = parts[1]
-                    if user_id not in user_keys:
-                        user_keys[user_id] = []
-                    user_keys[user_id].append(key)
+        # Fetch every key's type and summary in pipelined batches, one round-trip each
+        key_info = {}
+        ordered_keys = [key for keys in user_keys.values() for key in keys]
+        for start in range(0, len(ordered_keys), PIPELINE_BATCH):
+            batch = ordered_keys[start:start + PIPELINE_BATCH]
+            pipe = storage.redis_client.pipeline(transaction=False)
+            for key in batch:
+                pipe.type(key)
+                command = _summary_command(key)
+                if command:
+                    getattr(pipe, command)(key)
+            # Older repositories keep the structure as a list, where STRLEN errors; report those per key
+            results = iter(pipe.execute(raise_on_error=False))
+            for key in batch:
+                key_type = next(results)
+                key_info[key] = (key_type, next(results) if _summary_command(key) else None)
         
         print(f"\n👥 Found {len(user_keys)} users in Redis:")
         
@@ -43,21 +78,27 @@ def inspect_redis_contents():
             
             # Show key types
             for key in keys:
-                key_type = storage.redis_client.type(key)
+                key_type, value = key_info[key]
                 if ":repos:list" in key:
-                    repos = storage.redis_client.smembers(key)
+                    repos = value
                     print(f"   📋 {key} ({key_type}) -> {len(repos)} repos: {list(repos)}")
                 elif ":metadata" in key:
-                    metadata = storage.redis_client.hgetall(key)
+                    metadata = value
                     repo_name = metadata.get('repo_full_name', 'Unknown')
                     files_count = metadata.get('total_files', 'Unknown')
                     print(f"   📝 {key} ({key_type}) -> {repo_name} ({files_count} files)")
+                elif ":files:meta" in key:
+                    print(f"   🧾 {key} ({key_type}) -> {value} file entries")
                 elif ":files" in key:
-                    file_count = storage.redis_client.hlen(key)
+                    file_count = value
                     print(f"   📁 {key} ({key_type}) -> {file_count} files stored")
+                elif ":blobs" in key:
+                    print(f"   📦 {key} ({key_type}) -> {value} binary files")
                 elif ":structure" in key:
-                    structure_count = storage.redis_client.llen(key)
-                    print(f"   🌳 {key} ({key_type}) -> {structure_count} items")
+                    if key_type == "list":
+                        print(f"   🌳 {key} ({key_type}) -> legacy list of entries")
+                    else:
+                        print(f"   🌳 {key} ({key_type}) -> {value} bytes")
                 else:
                     print(f"   ❓ {key} ({key_type})")
         
@@ -67,41 +108,43 @@ def inspect_redis_contents():
         print(f"❌ Error inspecting Redis: {str(e)}")
         return False
 
-def show_specific_repo_files(user_email="test@example.com", repo_name="shivansh-2003/memo"):
+def show_specific_repo_files(user_email="test@example.com", repo_name="shivansh-2003/memo",
+                             storage: RedisRepoStorage = None):
     """Show files from a specific repository"""
     
     print(f"\n📂 Files in Repository: {repo_name}")
     print("=" * 50)
     
     try:
-        storage = RedisRepoStorage()
+        storage = storage or get_storage()
         repo_name_redis = repo_name.replace('/', '_')
         
-        # Get repository data
-        repo_data = storage.get_repository_files(user_email, repo_name_redis)
+        # Get repository metadata and per-file size/encoding; file contents stay in Redis
+        metadata = storage.get_repository_metadata(user_email, repo_name_redis)
         
-        if 'error' in repo_data:
-            print(f"❌ Error: {repo_data['error']}")
+        if not metadata:
+            print(f"❌ Error: Repository not found")
             return
         
-        print(f"📊 Repository: {repo_data['metadata']['repo_full_name']}")
-        print(f"📅 Downloaded: {repo_data['metadata']['download_timestamp']}")
-        print(f"📁 Total files: {len(repo_data['files'])}")
-        print(f"💾 Total size: {repo_data['metadata']['total_size_bytes']} bytes")
+        files_meta = storage.list_files_metadata(user_email, repo_name_redis)
+        
+        print(f"📊 Repository: {metadata['repo_full_name']}")
+        print(f"📅 Downloaded: {metadata['download_timestamp']}")
+        print(f"📁 Total files: {len(files_meta)}")
+        print(f"💾 Total size: {metadata['total_size_bytes']} bytes")
         
         print(f"\n📋 File List:")
-        for file_path, file_data in repo_data['files'].items():
-            encoding = file_data['encoding']
-            size = file_data['size']
+        for file_path, size, encoding in files_meta:
             print(f"  📄 {file_path} ({encoding}, {size} bytes)")
         
-        # Show content of a small file as example
+        # Show content of a small file as example; only that one file's content is fetched
         print(f"\n📖 Sample File Content:")
-        small_files = [(path, data) for path, data in repo_data['files'].items() 
-                      if data['size'] < 500 and data['encoding'] == 'utf-8']
+        small_files = [path for path, size, encoding in files_meta 
+                      if size < 500 and encoding == 'utf-8']
         
         if small_files:
-            sample_path, sample_data = small_files[0]
+            sample_path = small_files[0]
+            sample_data = storage.get_file(user_email, repo_name_redis, sample_path)
             print(f"📄 File: {sample_path}")
             print(f"🔍 Content preview:")
             content = sample_data['content'][:300]
@@ -113,14 +156,14 @@ def show_specific_repo_files(user_email="test@example.com", repo_name="shivansh-
         print(f"❌ Error showing repo files: {str(e)}")
         return False
 
-def show_redis_connection_info():
+def show_redis_connection_info(storage: RedisRepoStorage = None):
     """Show Redis Cloud connection details"""
     
     print("☁️ Redis Cloud Connection Info")
     print("=" * 50)
     
     try:
-        storage = RedisRepoStorage()
+        storage = storage or get_storage()
         
         # Get Redis info
         info = storage.redis_client.info()
@@ -151,14 +194,17 @@ if __name__ == "__main__":
     print("🔍 Redis Cloud Data Inspector")
     print("Checking what's stored in your Redis Cloud database...\n")
     
+    # One connection for the whole inspection
+    storage = get_storage()
+    
     # Show connection info
-    show_redis_connection_info()
+    show_redis_connection_info(storage)
     
     # Show all contents
-    inspect_redis_contents()
+    inspect_redis_contents(storage)
     
     # Show specific repo files
-    show_specific_repo_files("test@example.com", "shivansh-2003/memo")
-    show_specific_repo_files("quicktest@example.com", "shivansh-2003/memo")
+    show_specific_repo_files("test@example.com", "shivansh-2003/memo", storage)
+    show_specific_repo_files("quicktest@example.com", "shivansh-2003/memo", storage)
     
     print("\n✅ Inspection complete!")
\ No newline at end of file
@@ -3,28 +3,53 @@
 Script to clean up Redis data
 """
 
-from redis_imple import RedisRepoStorage
+from redis_imple import get_storage
+
+# Keys requested per SCAN round-trip; SCAN never blocks the server the way KEYS does
+SCAN_COUNT = 500
+# Emails used by the test scripts, for mapping hashed user IDs back to an address
+TEST_EMAILS = ("test@example.com", "quicktest@example.com", "user@example.com")
+# Keys unlinked per pipeline round-trip while deleting by pattern
+UNLINK_BATCH = 500
+
+def _delete_matching(storage, pattern):
+    """Delete every key matching pattern, returning the number deleted"""
+    # Keys are found with a client-side SCAN and unlinked in pipelined chunks. One UNLINK per
+    # key keeps every command single-key, so it also works where keys span cluster slots.
+    pipe = storage.redis_client.pipeline(transaction=False)
+    deleted = 0
+    for key in storage.redis_client.scan_iter(match=pattern, count=SCAN_COUNT):
+        pipe.unlink(key)
+        if len(pipe) >= UNLINK_BATCH:
+            deleted += sum(pipe.execute())
+    if len(pipe):
+        deleted += sum(pipe.execute())
+    return deleted
 
 def show_all_users():
     """Show all users in Redis"""
     print("👥 Users found in Redis:")
     
-    storage = RedisRepoStorage()
-    all_keys = storage.redis_client.keys("user:*:repos:list")
+    storage = get_storage()
+    id_to_email = {storage._generate_user_id(email): email for email in TEST_EMAILS}
+    user_keys = list(storage.redis_client.scan_iter(match="user:*:repos:list", count=SCAN_COUNT))
+    
+    # Only the repo counts are needed, so fetch every SCARD in one round-trip
+    pipe = storage.redis_client.pipeline(transaction=False)
+    for key in user_keys:
+        pipe.scard(key)
+    repo_counts = pipe.execute()
     
     users = []
-    for key in all_keys:
+    for key, repo_count in zip(user_keys, repo_counts):
         user_id = key.split(":")[1]
-        repos = storage.redis_client.smembers(key)
-        users.append((user_id, len(repos)))
-        print(f"   🔹 User ID: {user_id} ({len(repos)} repos)")
+        users.append((user_id, repo_count))
+        print(f"   🔹 User ID: {user_id} ({repo_count} repos)")
         
-        # Try to find the original email by checking test emails
-        test_emails = ["test@example.com", "quicktest@example.com", "user@example.com"]
-        for email in test_emails:
-            if storage._generate_user_id(email) == user_id:
-                print(f"      ↳ Original email: {email}")
-                break
+        # Try to find the original email among the test emails
+        email = id_to_email.get(user_id)
+        if email:
+            print(f"      ↳ Original email: {email}")
     
     return users
 
@@ -32,7 +57,7 @@ def delete_specific_repo(user_email, repo_name):
     """Delete a specific repository for a user"""
     print(f"🗑️ Deleting repository: {repo_name} for user: {user_email}")
     
-    storage = RedisRepoStorage()
+    storage = get_storage()
     repo_name_redis = repo_name.replace('/', '_')
     
     success = storage.delete_user_repository(user_email, repo_name_redis)
@@ -44,21 +69,17 @@ def delete_specific_repo(user_email, repo_name):
     
     return success
 
-def delete_all_user_data(user_identifier):
+def delete_all_user_data(user_identifier, pipe=None):
     """Delete ALL data for a user (accepts email or user ID)"""
     print(f"🗑️ Deleting ALL data for user: {user_identifier}")
     
-    storage = RedisRepoStorage()
+    storage = get_storage()
     
     # Check if it's a user ID (12 chars, hex) or email
     if len(user_identifier) == 12 and all(c in '0123456789abcdef' for c in user_identifier):
         # It's a user ID, find the email
-        test_emails = ["test@example.com", "quicktest@example.com", "user@example.com"]
-        user_email = None
-        for email in test_emails:
-            if storage._generate_user_id(email) == user_identifier:
-                user_email = email
-                break
+        id_to_email = {storage._generate_user_id(email): email for email in TEST_EMAILS}
+        user_email = id_to_email.get(user_identifier)
         
         if not user_email:
             print(f"❌ Could not find original email for user ID: {user_identifier}")
@@ -68,12 +89,15 @@ def delete_all_user_data(user_identifier):
     else:
         user_email = user_identifier
     
-    success = storage.delete_all_user_data(user_email)
+    success = storage.delete_all_user_data(user_email, pipe=pipe)
     
-    if success:
-        print("✅ All user data deleted successfully")
-    else:
+    if not success:
         print("❌ Failed to delete user data")
+    elif pipe is not None:
+        # Nothing is deleted until the caller executes the pipeline
+        print("🕒 User data deletes queued")
+    else:
+        print("✅ All user data deleted successfully")
     
     return success
 
@@ -81,28 +105,44 @@ def delete_all_test_data():
     """Delete all test data we created"""
     print("🧹 Cleaning up all test data...")
     
-    # Delete test users
-    delete_all_user_data("test@example.com")
-    delete_all_user_data("quicktest@example.com")
+    # Delete test users; both users' deletes go out on one pipeline
+    storage = get_storage()
+    pipe = storage.redis_client.pipeline(transaction=False)
+    queued = []  # (user, first command index, command count)
+    for user_email in ("test@example.com", "quicktest@example.com"):
+        start = len(pipe)
+        if delete_all_user_data(user_email, pipe=pipe):
+            queued.append((user_email, start, len(pipe) - start))
+        else:
+            print(f"❌ Could not queue deletes for {user_email}")
+    
+    # Check each user's share of the results, so one failed delete is not reported as success
+    results = pipe.execute(raise_on_error=False) if len(pipe) else []
+    all_deleted = len(queued) == 2
+    for user_email, start, count in queued:
+        user_results = results[start:start + count]
+        errors = [result for result in user_results if isinstance(result, Exception)]
+        if errors:
+            all_deleted = False
+            print(f"❌ Failed to delete data for {user_email}: {errors[0]}")
+        else:
+            print(f"✅ Deleted {sum(user_results)} keys for {user_email}")
     
-    print("✅ Cleanup complete!")
+    print("✅ Cleanup complete!" if all_deleted else "⚠️ Cleanup finished with errors")
 
 def delete_by_user_id_direct(user_id):
     """Delete data directly by user ID (bypasses email lookup)"""
     print(f"🗑️ Deleting data for user ID: {user_id}")
     
-    storage = RedisRepoStorage()
+    storage = get_storage()
     
-    # Get all keys for this user ID
-    pattern = f"user:{user_id}:*"
-    keys = storage.redis_client.keys(pattern)
+    # Delete all keys for this user ID
+    deleted = _delete_matching(storage, f"user:{user_id}:*")
     
-    if not keys:
+    if not deleted:
         print(f"❌ No data found for user ID: {user_id}")
         return False
     
-    # Delete all keys
-    deleted = storage.redis_client.delete(*keys)
     print(f"🗑️ Deleted {deleted} keys")
     print("✅ Data deleted successfully!")
     
@@ -114,11 +154,10 @@ def delete_everything():
     confirm = input("Type 'DELETE ALL' to confirm: ")
     
     if confirm == "DELETE ALL":
-        storage = RedisRepoStorage()
-        all_keys = storage.redis_client.keys("user:*")
+        storage = get_storage()
+        deleted = _delete_matching(storage, "user:*")
         
-        if all_keys:
-            deleted = storage.redis_client.delete(*all_keys)
+        if deleted:
             print(f"🗑️ Deleted {deleted} keys")
             print("✅ All data deleted!")
         else:
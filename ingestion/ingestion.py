@@ -3,66 +3,254 @@ import base64
 import json
 from dotenv import load_dotenv
 import os
+import sys
+import shutil
+import time
+import queue
+import logging
+import logging.handlers
+from urllib.parse import quote
 import base64
 from github import Github
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 load_dotenv()
 
+# Blob downloads in flight at once; GitHub's secondary rate limit is the practical ceiling
+DOWNLOAD_WORKERS = 32
+# Concurrent directory listings in the Contents API fallback walk
+LIST_WORKERS = 8
+# Bytes written per chunk when streaming raw files to disk
+RAW_CHUNK_SIZE = 64 * 1024
+# ETags and bodies of GitHub API responses, for conditional requests
+GITHUB_ETAG_CACHE = "github.etag.json"
+# Concurrent metadata requests; kept low to stay under GitHub's secondary rate limit
+ENRICH_WORKERS = 10
+ENRICH_RETRIES = 5
+
 # Your GitHub personal access token
 token = os.getenv("GITHUB_ACCESS_TOKEN")
 headers = {"Authorization": f"token {token}"}
 
+log = logging.getLogger(__name__)
+log.setLevel(logging.INFO)
+log.propagate = False
+
+# Keep-alive session shared by the raw file downloads
+session = requests.Session()
+session.headers.update(headers)
+# Ask for compressed bodies explicitly; they are decompressed while streaming to disk
+session.headers["Accept-Encoding"] = "gzip"
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=DOWNLOAD_WORKERS))
+
+def _stream_to_file(url, file_path):
+    """Stream url to disk in fixed-size chunks; returns False if the server refused it"""
+    with session.get(url, stream=True) as response:
+        if response.status_code != 200:
+            return False
+        response.raw.decode_content = True
+        with open(file_path, 'wb') as f:
+            shutil.copyfileobj(response.raw, f, RAW_CHUNK_SIZE)
+    return True
+
+def _download_blob(repo, commit_sha, entry, local_path):
+    """Download one tree entry to disk"""
+    file_path = os.path.join(local_path, entry.path)
+    try:
+        # Raw endpoint serves the file bytes directly: no base64 inflation or decode
+        # Percent-encode the path so spaces, '#', '?' and '%' in file names survive
+        url = f"https://raw.githubusercontent.com/{repo.full_name}/{commit_sha}/{quote(entry.path)}"
+        if _stream_to_file(url, file_path):
+            log.info("Downloaded: %s", entry.path)
+            return
+        
+        # Fall back to the (base64) blob API when the raw endpoint refuses the file
+        blob = repo.get_git_blob(entry.sha)
+        if blob.encoding == "base64":
+            # Decode base64 content
+            decoded_content = base64.b64decode(blob.content)
+            with open(file_path, 'wb') as f:
+                f.write(decoded_content)
+            log.info("Downloaded (base64): %s", entry.path)
+        else:
+            with open(file_path, 'wb') as f:
+                f.write(blob.content.encode('utf-8'))
+            log.info("Downloaded: %s", entry.path)
+    except Exception as e:
+        log.error("Error downloading %s: %s", entry.path, e)
+
 def download_repo_contents(repo, local_path="./downloaded_repo"):
-    contents = repo.get_contents("")
+    # Per-file progress goes through a queue drained by one thread, so download
+    # workers never contend on stdout writes
+    log_queue = queue.SimpleQueue()
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler(sys.stdout))
+    log.addHandler(queue_handler)
+    listener.start()
+    try:
+        return _download_repo_contents(repo, local_path)
+    finally:
+        listener.stop()
+        log.removeHandler(queue_handler)
+
+def _download_repo_contents(repo, local_path):
+    # Pin every raw download to one commit so the files match the listed tree
+    commit_sha = repo.get_branch(repo.default_branch).commit.sha
     
-    if not os.path.exists(local_path):
-        os.makedirs(local_path)
+    # One Git Trees API call lists every file, instead of one Contents call per directory
+    tree = repo.get_git_tree(commit_sha, recursive=True)
+    if tree.raw_data.get("truncated"):
+        # GitHub caps recursive trees; very large repos fall back to walking directories
+        print("Tree listing truncated, falling back to directory walk")
+        return _download_repo_contents_bfs(repo, local_path)
     
-    while contents:
-        file_content = contents.pop(0)
-        file_path = os.path.join(local_path, file_content.path)
-        
-        if file_content.type == "dir":
-            if not os.path.exists(file_path):
-                os.makedirs(file_path)
-            contents.extend(repo.get_contents(file_content.path))
+    # Create each directory once up front instead of per downloaded file
+    blobs = [entry for entry in tree.tree if entry.type == "blob"]
+    for directory in {os.path.dirname(entry.path) for entry in blobs}:
+        os.makedirs(os.path.join(local_path, directory), exist_ok=True)
+    
+    # Downloads are network-bound, so overlap them on a thread pool
+    with ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as pool:
+        list(pool.map(lambda entry: _download_blob(repo, commit_sha, entry, local_path), blobs))
+
+def _download_content_file(file_content, file_path):
+    """Download one Contents API file entry to disk"""
+    try:
+        # Stream from the raw download URL so large files are never held in memory
+        if file_content.download_url and _stream_to_file(file_content.download_url, file_path):
+            log.info("Downloaded: %s", file_content.path)
+        # Otherwise check if the file has content that can be decoded
+        elif file_content.encoding == "none":
+            log.info("Skipped: %s (no content available)", file_content.path)
+        elif file_content.encoding == "base64":
+            # Decode base64 content
+            decoded_content = base64.b64decode(file_content.content)
+            with open(file_path, 'wb') as f:
+                f.write(decoded_content)
+            log.info("Downloaded (base64): %s", file_content.path)
         else:
-            try:
-                # Check if the file has content that can be decoded
-                if file_content.encoding == "none":
-                    print(f"Skipped: {file_content.path} (no content available)")
-                    continue
-                elif file_content.encoding == "base64":
-                    # Decode base64 content
-                    decoded_content = base64.b64decode(file_content.content)
-                    with open(file_path, 'wb') as f:
-                        f.write(decoded_content)
-                    print(f"Downloaded (base64): {file_content.path}")
-                else:
-                    # Use the built-in decoded_content for other encodings
-                    with open(file_path, 'wb') as f:
-                        f.write(file_content.decoded_content)
-                    print(f"Downloaded: {file_content.path}")
-            except Exception as e:
-                print(f"Error downloading {file_content.path}: {str(e)}")
-                continue
+            # Use the built-in decoded_content for other encodings
+            with open(file_path, 'wb') as f:
+                f.write(file_content.decoded_content)
+            log.info("Downloaded: %s", file_content.path)
+    except Exception as e:
+        log.error("Error downloading %s: %s", file_content.path, e)
+
+def _download_repo_contents_bfs(repo, local_path):
+    """Walk the repository one directory at a time through the Contents API"""
+    os.makedirs(local_path, exist_ok=True)
+    
+    # Directory listings and file downloads run on separate pools, so files start
+    # downloading while deeper directories are still being listed
+    with ThreadPoolExecutor(max_workers=LIST_WORKERS) as listers, \
+            ThreadPoolExecutor(max_workers=DOWNLOAD_WORKERS) as downloaders:
+        pending = {listers.submit(repo.get_contents, "")}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for listing in done:
+                for file_content in listing.result():
+                    file_path = os.path.join(local_path, file_content.path)
+                    if file_content.type == "dir":
+                        os.makedirs(file_path, exist_ok=True)
+                        pending.add(listers.submit(repo.get_contents, file_content.path))
+                    else:
+                        downloaders.submit(_download_content_file, file_content, file_path)
 
 # Usage
 
 # List all repositories you have access to
+def _load_etag_cache():
+    try:
+        with open(GITHUB_ETAG_CACHE, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_etag_cache(cache):
+    # Machine-only file: one-shot compact dumps stays in the C encoder
+    with open(GITHUB_ETAG_CACHE, 'w') as f:
+        f.write(json.dumps(cache))
+
+def _conditional_get(url, cache):
+    """GET a GitHub API URL, revalidating against its cached ETag.
+    
+    Returns (status code, page) where page holds the JSON body and next-page link;
+    a 304 carries no body and does not count against the rate limit.
+    """
+    cached_page = cache.get(url)
+    # Only revalidate when there is a cached body to fall back on
+    if cached_page and cached_page.get("etag") and "items" in cached_page:
+        response = session.get(url, headers={"If-None-Match": cached_page["etag"]})
+        if response.status_code == 304:
+            return 200, cached_page
+    else:
+        response = session.get(url)
+    if response.status_code == 304:
+        # Not modified but nothing usable cached: fetch the body unconditionally
+        response = session.get(url, headers={"Cache-Control": "no-cache"})
+    if response.status_code != 200:
+        return response.status_code, None
+    
+    page = {
+        "etag": response.headers.get("ETag", ""),
+        "items": response.json(),
+        "next": response.links.get("next", {}).get("url")
+    }
+    if page["etag"]:
+        cache[url] = page
+    return 200, page
+
 def list_repos():
+    # Follow every page, each revalidated against the on-disk ETag cache
+    cache = _load_etag_cache()
+    repos = []
     url = "https://api.github.com/user/repos?per_page=100"
-    response = requests.get(url, headers=headers)
-    return response.json() if response.status_code == 200 else None
+    
+    while url:
+        _, page = _conditional_get(url, cache)
+        if page is None:
+            return None
+        repos.extend(page["items"])
+        url = page["next"]
+    
+    _save_etag_cache(cache)
+    return repos
+
+def _fetch_languages(repo, cache):
+    """Language byte counts for one repository, backing off on rate limiting"""
+    delay = 1
+    for _ in range(ENRICH_RETRIES):
+        status, page = _conditional_get(repo["languages_url"], cache)
+        if page is not None:
+            return page["items"]
+        if status not in (403, 429):
+            break
+        time.sleep(delay)
+        delay *= 2
+    return {}
+
+# Fetch per-repository language stats concurrently
+def fetch_repo_languages(repos):
+    cache = _load_etag_cache()
+    with ThreadPoolExecutor(max_workers=ENRICH_WORKERS) as pool:
+        languages = list(pool.map(lambda repo: _fetch_languages(repo, cache), repos))
+    _save_etag_cache(cache)
+    return languages
 
 # Save repository list to JSON file
-def save_repos_to_json(filename="repos.json"):
+def save_repos_to_json(filename="repos.json", include_languages=False):
     repos = list_repos()
     if repos:
         # Extract only the full_name from each repository
         repo_names = [repo["full_name"] for repo in repos]
         
+        if include_languages:
+            languages = fetch_repo_languages(repos)
+            entries = [{"full_name": name, "languages": langs} for name, langs in zip(repo_names, languages)]
+        else:
+            entries = repo_names
+        
         with open(filename, 'w') as f:
-            json.dump(repo_names, f, indent=2)
+            json.dump(entries, f, indent=2)
         print(f"Repository names saved to {filename}")
         print(f"Found {len(repo_names)} repositories")
         
@@ -2,25 +2,227 @@ import redis
 import json
 import base64
 import os
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime, timedelta
 from github import Github
 from dotenv import load_dotenv
 import hashlib
+import socket
+import zlib
+import binascii
+import mmap
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from collections import deque
 # Import ingestion functionality  
 from ingestion import download_repo_contents, list_repos, save_repos_to_json
 
 load_dotenv()
 
+# Files buffered before being written with one multi-field HSET per hash and a pipeline flush
+FILE_BATCH_SIZE = 500
+# Expected per-file metadata entries per shard. Redis keeps hashes of up to 128 entries
+# (default hash-max-listpack-entries) in the compact listpack encoding; paths hash to
+# shards unevenly, so targeting half that keeps even the fullest shard below the limit
+META_SHARD_ENTRIES = 64
+# Characters of the GitHub blob sha kept in packed metadata (git's short-sha length),
+# so packed values stay within hash-max-listpack-value (64 bytes)
+META_SHA_CHARS = 7
+# Text files at least this large are stored zlib-compressed in the blobs hash
+COMPRESS_MIN_BYTES = 256
+COMPRESS_LEVEL = 6
+# Concurrent file reads while storing a local repository
+READ_WORKERS = 16
+# Files at least this large are memory-mapped instead of read onto the heap
+MMAP_MIN_BYTES = 512 * 1024
+# Concurrent file writes while exporting a repository
+WRITE_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+# Base64 characters decoded per write when exporting legacy content (a multiple of 4)
+B64_CHUNK_CHARS = 64 * 1024
+# Concurrent GitHub API requests; kept low to stay under GitHub's secondary rate limit
+GITHUB_WORKERS = 8
+# Keys requested per SCAN step when walking the keyspace
+SCAN_COUNT = 1000
+# Connections per Redis pool; room for every reader/fetcher thread plus the writer
+REDIS_MAX_CONNECTIONS = 32
+# Seconds a pooled connection may sit idle before it is PINGed on checkout
+REDIS_HEALTH_CHECK_INTERVAL = 30
+# TCP keepalive probing (idle seconds, probe interval, probe count) so NATs in front of
+# Redis Cloud do not silently drop idle connections; options the platform lacks are left out
+REDIS_KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 30), ('TCP_KEEPCNT', 3))
+    if hasattr(socket, name)
+}
+
+# One reusable compact encoder for the per-file JSON: no separator whitespace and
+# no \uXXXX escaping of non-ASCII source text, still on the C encoder path
+_encode_json = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False).encode
+
+# Bytes that can appear in text files: common control characters plus everything from 0x20 up, except DEL
+_TEXTCHARS = bytes({7, 8, 9, 10, 12, 13, 27} | set(range(0x20, 0x100)) - {0x7f})
+
+# Dependency, cache and build output directories that are never stored
+_SKIP_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv', '.mypy_cache', '.pytest_cache',
+    'dist', 'build', '.next', 'target'
+})
+
+# Extensions whose encoding is known up front, so their contents skip binary detection
+_TEXT_EXTS = frozenset({
+    '.py', '.js', '.ts', '.tsx', '.jsx', '.md', '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg',
+    '.txt', '.html', '.css', '.sh', '.rs', '.go', '.java', '.c', '.h', '.cpp', '.hpp'
+})
+_BIN_EXTS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.pdf', '.zip', '.gz', '.whl', '.so', '.dll', '.exe', '.pyc',
+    '.woff', '.woff2', '.ico'
+})
+
+@lru_cache(maxsize=4096)
+def _user_id(identifier: str) -> str:
+    """Memoized user ID derivation; module-level so the cache is shared and not keyed on self"""
+    # MD5 only derives stable key names here; changing the hash would orphan every stored user
+    return hashlib.md5(identifier.encode(), usedforsecurity=False).hexdigest()[:12]
+
+# Where a file's content lives: inline in the files hash, raw in the blobs hash,
+# or zlib-compressed UTF-8 text in the blobs hash
+STORAGE_INLINE, STORAGE_BLOB, STORAGE_ZLIB = 'inline', 'blob', 'zlib'
+
+def _pack_file_meta(encoding: str, size: int, original_size: int, storage: str, sha: str = '') -> str:
+    """Pack per-file metadata into one short field value (no JSON to parse on read)"""
+    return f"{encoding}|{size}|{original_size}|{storage}|{sha[:META_SHA_CHARS]}"
+
+def _unpack_file_meta(file_path: str, value: str) -> Dict[str, Any]:
+    """Rebuild a file data dictionary (without content) from a packed metadata value"""
+    encoding, size, original_size, storage, sha = value.split('|')
+    file_data = {'encoding': encoding, 'size': int(size), 'path': file_path, 'original_size': int(original_size)}
+    if sha:
+        file_data['sha'] = sha
+    if storage != STORAGE_INLINE:
+        file_data['blob'] = True
+        if storage == STORAGE_ZLIB:
+            file_data['compression'] = 'zlib'
+    return file_data
+
+def _is_packed_meta(meta_data: Dict[str, str]) -> bool:
+    """True when a repository's metadata values are packed (older ones are JSON)"""
+    return bool(meta_data) and not next(iter(meta_data.values())).startswith('{')
+
+def _walk_scandir(root: str, rel_root: str = ''):
+    """
+    Top-down os.walk equivalent built on os.scandir.
+    
+    Yields (relative root, directory DirEntries, file DirEntries); DirEntry type
+    checks and stat() are served from the directory listing where the OS allows.
+    """
+    dirs, files = [], []
+    try:
+        with os.scandir(root) as entries:
+            for entry in entries:
+                (dirs if entry.is_dir() else files).append(entry)
+    except OSError:
+        return
+    
+    yield rel_root, dirs, files
+    
+    for dir_entry in dirs:
+        # Like os.walk, list symlinked directories but do not descend into them
+        if not dir_entry.is_symlink():
+            yield from _walk_scandir(dir_entry.path, f"{rel_root}/{dir_entry.name}" if rel_root else dir_entry.name)
+
+def _write_base64(f, content: str):
+    """Decode base64 text into an open binary file one chunk at a time, never holding the whole payload"""
+    # Stored base64 has no line breaks, so every aligned slice decodes on its own
+    for start in range(0, len(content), B64_CHUNK_CHARS):
+        f.write(binascii.a2b_base64(content[start:start + B64_CHUNK_CHARS]))
+
+def _write_bytes_file(local_file_path: str, content: bytes):
+    """Write bytes content as-is, returning the exception instead of raising so pool results stay in order"""
+    try:
+        with open(local_file_path, 'wb') as f:
+            f.write(content)
+    except Exception as e:
+        return e
+
+def _write_base64_file(local_file_path: str, content: str):
+    """Decode legacy base64 content and write binary, returning the exception instead of raising"""
+    try:
+        with open(local_file_path, 'wb', buffering=1 << 20) as f:
+            _write_base64(f, content)
+    except Exception as e:
+        return e
+
+def _write_text_file(local_file_path: str, content: str):
+    """Write text content, returning the exception instead of raising"""
+    try:
+        with open(local_file_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+    except Exception as e:
+        return e
+
+def _read_bytes(file_path: str, file_size: int):
+    """Read a whole file, returning the exception instead of raising so pool results stay in order"""
+    try:
+        with open(file_path, 'rb') as f:
+            if file_size >= MMAP_MIN_BYTES:
+                # The caller closes the map once the contents are stored
+                return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return f.read()
+    except Exception as e:
+        return e
+
+def _iter_read_files(to_read: List[Tuple[str, str, int]]):
+    """Yield (relative path, size, bytes, mmap or exception) in order, reading one batch at a time on a thread pool"""
+    # Reads block in the kernel and release the GIL, so a pool keeps many in flight;
+    # batching bounds how many file bodies are held in memory at once
+    with ThreadPoolExecutor(max_workers=READ_WORKERS) as executor:
+        for start in range(0, len(to_read), FILE_BATCH_SIZE):
+            batch = to_read[start:start + FILE_BATCH_SIZE]
+            results = executor.map(_read_bytes, [file_path for _, file_path, _ in batch],
+                                   [file_size for _, _, file_size in batch])
+            for (rel_file_path, _, file_size), raw in zip(batch, results):
+                yield rel_file_path, file_size, raw
+
+def _fetch_github_content(file_content):
+    """Fetch one GitHub file's content as (redis content, encoding), returning any exception instead of raising"""
+    try:
+        # Get file content
+        if file_content.encoding == "base64":
+            # Decode base64 content and re-encode for Redis storage
+            decoded_content = base64.b64decode(file_content.content)
+            # Store as base64 string in Redis for binary files
+            return base64.b64encode(decoded_content).decode('utf-8'), 'base64'
+        elif file_content.encoding == "utf-8":
+            # Store text content directly
+            return file_content.decoded_content.decode('utf-8'), 'utf-8'
+        else:
+            # Handle other encodings
+            return str(file_content.decoded_content), 'decoded'
+    except Exception as e:
+        return e
+
+def _iter_github_contents(to_fetch: list):
+    """Yield (file content, fetched content or exception) in order, fetching one batch at a time on a thread pool"""
+    # Each file's content is its own GitHub request, so keep several in flight
+    with ThreadPoolExecutor(max_workers=GITHUB_WORKERS) as executor:
+        for start in range(0, len(to_fetch), FILE_BATCH_SIZE):
+            batch = to_fetch[start:start + FILE_BATCH_SIZE]
+            yield from zip(batch, executor.map(_fetch_github_content, batch))
+
 class RedisRepoStorage:
     """
     Redis-based repository storage system for GitHub repositories.
     
     Key Pattern Structure:
     - user:{user_id}:repos:list -> Set of repository names for this user
-    - user:{user_id}:repo:{repo_name}:files -> Hash of file paths and contents
+    - user:{user_id}:repo:{repo_name}:files -> Hash of file paths and inline (text) contents
+    - user:{user_id}:repo:{repo_name}:files:meta:{shard} -> Hashes of file paths and packed
+      encoding|size|original_size|storage|short sha, sharded by path so each stays small
+      enough for Redis' compact listpack encoding (as long as paths fit in 64 bytes)
+    - user:{user_id}:repo:{repo_name}:blobs -> Hash of file paths and raw bytes of binary files
+      and zlib-compressed text files
     - user:{user_id}:repo:{repo_name}:metadata -> Hash of repository metadata
-    - user:{user_id}:repo:{repo_name}:structure -> List of directory structure
+    - user:{user_id}:repo:{repo_name}:structure -> Directory structure as one JSON array string
     """
     
     def __init__(self, redis_host=None, redis_port=None, redis_db=0, 
@@ -41,15 +243,28 @@ class RedisRepoStorage:
         self.redis_password = redis_password or os.getenv('REDIS_PASSWORD', 'H010eGSnpXJnso5GfUxkzvtU9qYZpnnD')
         self.redis_username = redis_username or os.getenv('REDIS_USERNAME', 'default')
         
-        # Initialize Redis connection for Redis Cloud
-        self.redis_client = redis.Redis(
+        # Initialize Redis connection for Redis Cloud; commands reuse pooled connections,
+        # so threads running reads or pipelines each get their own socket
+        pool_options = dict(
             host=self.redis_host,
             port=self.redis_port,
             db=redis_db,
             username=self.redis_username,
             password=self.redis_password,
-            decode_responses=True  # Automatically decode byte responses to strings
+            max_connections=REDIS_MAX_CONNECTIONS,
+            socket_keepalive=True,
+            socket_keepalive_options=REDIS_KEEPALIVE_OPTIONS,
+            health_check_interval=REDIS_HEALTH_CHECK_INTERVAL
+        )
+        self.connection_pool = redis.ConnectionPool(
+            decode_responses=True,  # Automatically decode byte responses to strings
+            **pool_options
         )
+        self.redis_client = redis.Redis(connection_pool=self.connection_pool)
+        
+        # Binary file bytes are stored raw, so they need a client that does not decode replies
+        self.binary_pool = redis.ConnectionPool(decode_responses=False, **pool_options)
+        self.binary_client = redis.Redis(connection_pool=self.binary_pool)
         
         # Test Redis connection
         try:
@@ -76,12 +291,36 @@ class RedisRepoStorage:
         Returns:
             Hashed user ID for Redis keys
         """
-        return hashlib.md5(identifier.encode()).hexdigest()[:12]
+        return _user_id(identifier)
 
     def _get_repo_files_key(self, user_id: str, repo_name: str) -> str:
         """Generate Redis key for repository files"""
         return f"user:{user_id}:repo:{repo_name}:files"
     
+    def _get_repo_files_meta_key(self, user_id: str, repo_name: str, shard: int = None) -> str:
+        """Generate Redis key for per-file size/encoding (no contents); unsharded without a shard"""
+        key = f"user:{user_id}:repo:{repo_name}:files:meta"
+        return key if shard is None else f"{key}:{shard}"
+    
+    def _get_files_meta_shards(self, user_id: str, repo_name: str) -> int:
+        """Number of per-file metadata shards recorded for a stored repository"""
+        return int(self.redis_client.hget(self._get_repo_metadata_key(user_id, repo_name), 'files_meta_shards') or 0)
+    
+    def _get_repo_data_keys(self, user_id: str, repo_name: str, meta_shards: int) -> List[str]:
+        """Every key holding a repository's data (the user's repository list excluded)"""
+        return [
+            self._get_repo_files_key(user_id, repo_name),
+            self._get_repo_files_meta_key(user_id, repo_name),
+            *[self._get_repo_files_meta_key(user_id, repo_name, shard) for shard in range(meta_shards)],
+            self._get_repo_blobs_key(user_id, repo_name),
+            self._get_repo_metadata_key(user_id, repo_name),
+            self._get_repo_structure_key(user_id, repo_name)
+        ]
+    
+    def _get_repo_blobs_key(self, user_id: str, repo_name: str) -> str:
+        """Generate Redis key for raw binary file contents"""
+        return f"user:{user_id}:repo:{repo_name}:blobs"
+    
     def _get_repo_metadata_key(self, user_id: str, repo_name: str) -> str:
         """Generate Redis key for repository metadata"""
         return f"user:{user_id}:repo:{repo_name}:metadata"
@@ -94,37 +333,50 @@ class RedisRepoStorage:
         """Generate Redis key for user's repository list"""
         return f"user:{user_id}:repos:list"
 
-    def _detect_file_encoding(self, file_path: str) -> str:
+    def _detect_encoding(self, raw: bytes) -> str:
         """
-        Detect if a file is binary or text and return appropriate encoding.
+        Detect if file contents are binary or text and return appropriate encoding.
         
         Args:
-            file_path: Path to the file
+            raw: File contents; only the first 1024 bytes are inspected
             
         Returns:
             'binary' for binary files, 'utf-8' for text files
         """
-        try:
-            with open(file_path, 'rb') as f:
-                # Read first 1024 bytes to check for binary content
-                chunk = f.read(1024)
-                
-            # Check for null bytes (common in binary files)
-            if b'\x00' in chunk:
-                return 'binary'
-            
-            # Try to decode as UTF-8
-            try:
-                chunk.decode('utf-8')
-                return 'utf-8'
-            except UnicodeDecodeError:
-                return 'binary'
-                
-        except Exception:
+        chunk = raw[:1024]
+        # Null bytes or control bytes outside the text set mean binary; translate
+        # deletes every text byte in one C pass, so anything left over is suspect
+        if b'\x00' in chunk or chunk.translate(None, _TEXTCHARS):
             return 'binary'
+        return 'utf-8'
+
+    def _flush_file_batch(self, pipe, files_key: str, file_batch: Dict[str, str],
+                          blobs_key: str = None, blob_batch: Dict[str, bytes] = None):
+        """Write buffered file fields with one HSET per hash and flush the pipeline"""
+        if file_batch:
+            pipe.hset(files_key, mapping=file_batch)
+        pipe.execute()
+        if blob_batch:
+            self.binary_client.hset(blobs_key, mapping=blob_batch)
+            blob_batch.clear()
+        file_batch.clear()
+
+    def _queue_files_meta(self, pipe, user_id: str, repo_name: str, files_meta: Dict[str, str]) -> List[str]:
+        """Queue per-file metadata spread over shards of about META_SHARD_ENTRIES entries, returning the shard keys"""
+        shards = max(1, -(-len(files_meta) // META_SHARD_ENTRIES))
+        buckets = [{} for _ in range(shards)]
+        for file_path, file_meta_json in files_meta.items():
+            buckets[zlib.crc32(file_path.encode('utf-8')) % shards][file_path] = file_meta_json
+        
+        shard_keys = [self._get_repo_files_meta_key(user_id, repo_name, shard) for shard in range(shards)]
+        for shard_key, bucket in zip(shard_keys, buckets):
+            if bucket:
+                pipe.hset(shard_key, mapping=bucket)
+        return shard_keys
 
     def store_local_repo_to_redis(self, user_identifier: str, repo_full_name: str, 
-                                local_repo_path: str = "./downloaded_repo") -> bool:
+                                local_repo_path: str = "./downloaded_repo",
+                                max_file_size_mb: int = 5) -> bool:
         """
         Store a locally downloaded repository to Redis.
         This works with repositories downloaded by ingestion.py
@@ -133,6 +385,7 @@ class RedisRepoStorage:
             user_identifier: User identifier (email, username, etc.)
             repo_full_name: Repository name in format 'owner/repo'
             local_repo_path: Path to the locally downloaded repository
+            max_file_size_mb: Maximum file size to store (in MB)
             
         Returns:
             True if successful, False otherwise
@@ -155,86 +408,121 @@ class RedisRepoStorage:
             
             # Get Redis keys
             files_key = self._get_repo_files_key(user_id, repo_name)
+            blobs_key = self._get_repo_blobs_key(user_id, repo_name)
             metadata_key = self._get_repo_metadata_key(user_id, repo_name)
             structure_key = self._get_repo_structure_key(user_id, repo_name)
             user_repos_key = self._get_user_repos_key(user_id)
             
+            # All writes go through one non-transactional pipeline, flushed in batches
+            pipe = self.redis_client.pipeline(transaction=False)
+            
             # Clear existing data for this repo
-            self.redis_client.delete(files_key, metadata_key, structure_key)
+            pipe.unlink(*self._get_repo_data_keys(user_id, repo_name, self._get_files_meta_shards(user_id, repo_name)))
+            
+            # File fields collected for the next multi-field HSET; the small per-file
+            # metadata is kept for the whole repo and sharded once the file count is known
+            file_batch = {}
+            files_meta = {}
+            blob_batch = {}
             
             # Walk through the local repository
             directory_structure = []
             
-            for root, dirs, files in os.walk(local_repo_path):
-                # Get relative path from repo root
-                rel_root = os.path.relpath(root, local_repo_path)
-                if rel_root == '.':
-                    rel_root = ''
+            to_read = []
+            
+            max_size_bytes = max_file_size_mb * 1024 * 1024
+            for rel_root, dirs, files in _walk_scandir(local_repo_path):
+                # Prune skipped directories in place so the walk never descends into them
+                dirs[:] = [dir_entry for dir_entry in dirs if dir_entry.name not in _SKIP_DIRS]
                 
                 # Add directories to structure
-                for dir_name in dirs:
-                    dir_path = os.path.join(rel_root, dir_name) if rel_root else dir_name
+                for dir_entry in dirs:
                     directory_structure.append({
-                        'path': dir_path.replace('\\', '/'),  # Normalize path separators
+                        'path': f"{rel_root}/{dir_entry.name}" if rel_root else dir_entry.name,
                         'type': 'dir',
                         'size': 0
                     })
                 
-                # Process files
-                for file_name in files:
-                    file_path = os.path.join(root, file_name)
-                    
-                    # Get relative path for Redis storage
-                    rel_file_path = os.path.relpath(file_path, local_repo_path)
-                    rel_file_path = rel_file_path.replace('\\', '/')  # Normalize path separators
+                # Collect files; they are read concurrently below
+                for file_entry in files:
+                    # Get relative path for Redis storage (always '/'-separated)
+                    rel_file_path = f"{rel_root}/{file_entry.name}" if rel_root else file_entry.name
                     
                     try:
-                        # Get file size
-                        file_size = os.path.getsize(file_path)
-                        
-                        # Add to directory structure
-                        directory_structure.append({
-                            'path': rel_file_path,
-                            'type': 'file',
-                            'size': file_size
-                        })
-                        
-                        # Detect file encoding
-                        encoding = self._detect_file_encoding(file_path)
-                        
-                        if encoding == 'binary':
-                            # Read binary file and encode as base64
-                            with open(file_path, 'rb') as f:
-                                binary_content = f.read()
-                            redis_content = base64.b64encode(binary_content).decode('utf-8')
-                            content_encoding = 'base64'
-                        else:
-                            # Read text file
-                            with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                                redis_content = f.read()
-                            content_encoding = 'utf-8'
-                        
-                        # Create file data
-                        file_data = {
-                            'content': redis_content,
-                            'encoding': content_encoding,
-                            'size': len(redis_content),
-                            'path': rel_file_path,
-                            'original_size': file_size
-                        }
-                        
-                        # Store in Redis
-                        self.redis_client.hset(files_key, rel_file_path, json.dumps(file_data))
-                        
-                        files_stored += 1
-                        total_size += len(redis_content)
-                        
-                        if files_stored % 10 == 0:
-                            print(f"📁 Processed {files_stored} files...")
-                        
-                    except Exception as e:
+                        # Get file size from the DirEntry's stat
+                        file_size = file_entry.stat().st_size
+                    except OSError as e:
                         print(f"⚠️  Skipped file {rel_file_path}: {str(e)}")
                         continue
+                    
+                    # Add to directory structure
+                    directory_structure.append({
+                        'path': rel_file_path,
+                        'type': 'file',
+                        'size': file_size
+                    })
+                    
+                    # Skip files that are too large
+                    if file_size > max_size_bytes:
+                        print(f"⚠️  Skipped large file: {rel_file_path} ({file_size} bytes)")
+                        continue
+                    to_read.append((rel_file_path, file_entry.path, file_size))
+            
+            # Process files in walk order while the pool reads ahead
+            for rel_file_path, file_size, raw in _iter_read_files(to_read):
+                try:
+                    if isinstance(raw, Exception):
+                        raise raw
+                    
+                    # Known extensions decide the encoding; anything else is detected from the bytes in memory
+                    ext = os.path.splitext(rel_file_path)[1].lower()
+                    if ext in _TEXT_EXTS:
+                        encoding = 'utf-8'
+                    elif ext in _BIN_EXTS:
+                        encoding = 'binary'
+                    else:
+                        encoding = self._detect_encoding(raw)
+                    
+                    if encoding == 'binary':
+                        # Store binary bytes raw in the blobs hash; no base64 or JSON escaping
+                        blob_batch[rel_file_path] = bytes(raw) if isinstance(raw, mmap.mmap) else raw
+                        stored_size = file_size
+                        files_meta[rel_file_path] = _pack_file_meta('base64', stored_size, file_size, STORAGE_BLOB)
+                    else:
+                        # Decode text file; valid UTF-8 is already its own encoding, so only
+                        # files that needed replacement characters are re-encoded
+                        try:
+                            redis_content = str(raw, 'utf-8')
+                            encoded = raw
+                        except UnicodeDecodeError:
+                            redis_content = str(raw, 'utf-8', 'replace')
+                            encoded = redis_content.encode('utf-8')
+                        stored_size = len(redis_content)
+                        
+                        # Source text compresses several-fold, so store larger files compressed
+                        if len(raw) >= COMPRESS_MIN_BYTES:
+                            blob_batch[rel_file_path] = zlib.compress(encoded, COMPRESS_LEVEL)
+                            storage = STORAGE_ZLIB
+                        else:
+                            file_batch[rel_file_path] = redis_content
+                            storage = STORAGE_INLINE
+                        files_meta[rel_file_path] = _pack_file_meta('utf-8', stored_size, file_size, storage)
+                    
+                    files_stored += 1
+                    total_size += stored_size
+                    
+                    if len(file_batch) + len(blob_batch) >= FILE_BATCH_SIZE:
+                        self._flush_file_batch(pipe, files_key, file_batch, blobs_key, blob_batch)
+                    
+                    if files_stored % 10 == 0:
+                        print(f"📁 Processed {files_stored} files...")
+                    
+                except Exception as e:
+                    print(f"⚠️  Skipped file {rel_file_path}: {str(e)}")
+                    continue
+                finally:
+                    if isinstance(raw, mmap.mmap):
+                        raw.close()
             
             # Store repository metadata
             metadata = {
@@ -249,20 +537,28 @@ class RedisRepoStorage:
                 'total_size_bytes': total_size
             }
             
-            # Store metadata and structure in Redis
-            self.redis_client.hset(metadata_key, mapping=metadata)
-            self.redis_client.rpush(structure_key, *[json.dumps(item) for item in directory_structure])
+            # Store remaining files, metadata and structure in Redis
+            self._flush_file_batch(pipe, files_key, file_batch, blobs_key, blob_batch)
+            files_meta_keys = self._queue_files_meta(pipe, user_id, repo_name, files_meta)
+            metadata['files_meta_shards'] = len(files_meta_keys)
+            pipe.hset(metadata_key, mapping=metadata)
+            # The whole structure is written and read as one value
+            pipe.set(structure_key, _encode_json(directory_structure))
             
             # Add this repository to user's repository list
-            self.redis_client.sadd(user_repos_key, repo_name)
+            pipe.sadd(user_repos_key, repo_name)
             
             # Set expiration for user data (optional - 7 days default)
             expiration_days = 7
             expiration_seconds = expiration_days * 24 * 3600
-            self.redis_client.expire(files_key, expiration_seconds)
-            self.redis_client.expire(metadata_key, expiration_seconds)
-            self.redis_client.expire(structure_key, expiration_seconds)
-            self.redis_client.expire(user_repos_key, expiration_seconds)
+            pipe.expire(files_key, expiration_seconds)
+            for files_meta_key in files_meta_keys:
+                pipe.expire(files_meta_key, expiration_seconds)
+            pipe.expire(blobs_key, expiration_seconds)
+            pipe.expire(metadata_key, expiration_seconds)
+            pipe.expire(structure_key, expiration_seconds)
+            pipe.expire(user_repos_key, expiration_seconds)
+            pipe.execute()
             
             print(f"✅ Local repository storage completed!")
             print(f"📊 Statistics:")
@@ -363,12 +659,21 @@ class RedisRepoStorage:
             
             # Get Redis keys
             files_key = self._get_repo_files_key(user_id, repo_name)
+            blobs_key = self._get_repo_blobs_key(user_id, repo_name)
             metadata_key = self._get_repo_metadata_key(user_id, repo_name)
             structure_key = self._get_repo_structure_key(user_id, repo_name)
             user_repos_key = self._get_user_repos_key(user_id)
             
+            # All writes go through one non-transactional pipeline, flushed in batches
+            pipe = self.redis_client.pipeline(transaction=False)
+            
             # Clear existing data for this repo
-            self.redis_client.delete(files_key, metadata_key, structure_key)
+            pipe.unlink(*self._get_repo_data_keys(user_id, repo_name, self._get_files_meta_shards(user_id, repo_name)))
+            
+            # File fields collected for the next multi-field HSET; the small per-file
+            # metadata is kept for the whole repo and sharded once the file count is known
+            file_batch = {}
+            files_meta = {}
             
             # Store repository metadata
             metadata = {
@@ -382,93 +687,91 @@ class RedisRepoStorage:
                 'total_size_bytes': 0  # Will update this later
             }
             
-            # Get all repository contents recursively
-            contents = repo.get_contents("")
+            # List directories concurrently; results are consumed in submission order,
+            # so the structure keeps the same breadth-first order as a serial walk
             directory_structure = []
-            
-            while contents:
-                file_content = contents.pop(0)
-                files_processed += 1
-                
-                # Add to directory structure
-                directory_structure.append({
-                    'path': file_content.path,
-                    'type': file_content.type,
-                    'size': file_content.size if hasattr(file_content, 'size') else 0
-                })
-                
-                if file_content.type == "dir":
-                    # Add directory contents to processing queue
+            to_fetch = []
+            with ThreadPoolExecutor(max_workers=GITHUB_WORKERS) as listers:
+                pending = deque([("", listers.submit(repo.get_contents, ""))])
+                while pending:
+                    dir_path, listing = pending.popleft()
                     try:
-                        contents.extend(repo.get_contents(file_content.path))
+                        dir_contents = listing.result()
                     except Exception as e:
-                        print(f"⚠️  Skipped directory {file_content.path}: {str(e)}")
+                        print(f"⚠️  Skipped directory {dir_path}: {str(e)}")
                         continue
-                else:
-                    # Process file
-                    try:
-                        # Skip files that are too large
-                        if hasattr(file_content, 'size') and file_content.size > max_size_bytes:
-                            print(f"⚠️  Skipped large file: {file_content.path} ({file_content.size} bytes)")
-                            continue
-                        
-                        # Get file content
-                        if file_content.encoding == "base64":
-                            # Decode base64 content and re-encode for Redis storage
-                            decoded_content = base64.b64decode(file_content.content)
-                            # Store as base64 string in Redis for binary files
-                            redis_content = base64.b64encode(decoded_content).decode('utf-8')
-                            content_encoding = 'base64'
-                        elif file_content.encoding == "utf-8":
-                            # Store text content directly
-                            redis_content = file_content.decoded_content.decode('utf-8')
-                            content_encoding = 'utf-8'
-                        else:
-                            # Handle other encodings
-                            redis_content = str(file_content.decoded_content)
-                            content_encoding = 'decoded'
+                    
+                    for file_content in dir_contents:
+                        files_processed += 1
                         
-                        # Store file in Redis hash
-                        file_data = {
-                            'content': redis_content,
-                            'encoding': content_encoding,
-                            'size': len(redis_content),
+                        # Add to directory structure
+                        directory_structure.append({
                             'path': file_content.path,
-                            'sha': file_content.sha
-                        }
-                        
-                        # Store in Redis
-                        self.redis_client.hset(files_key, file_content.path, json.dumps(file_data))
-                        
-                        files_stored += 1
-                        total_size += len(redis_content)
-                        
-                        if files_stored % 10 == 0:
-                            print(f"📁 Processed {files_stored} files...")
+                            'type': file_content.type,
+                            'size': file_content.size if hasattr(file_content, 'size') else 0
+                        })
                         
-                    except Exception as e:
-                        print(f"⚠️  Skipped file {file_content.path}: {str(e)}")
-                        continue
+                        if file_content.type == "dir":
+                            # Add directory contents to processing queue
+                            pending.append((file_content.path, listers.submit(repo.get_contents, file_content.path)))
+                        elif hasattr(file_content, 'size') and file_content.size > max_size_bytes:
+                            # Skip files that are too large
+                            print(f"⚠️  Skipped large file: {file_content.path} ({file_content.size} bytes)")
+                        else:
+                            to_fetch.append(file_content)
+            
+            # Fetch file contents concurrently, storing them in listing order
+            for file_content, fetched in _iter_github_contents(to_fetch):
+                try:
+                    if isinstance(fetched, Exception):
+                        raise fetched
+                    redis_content, content_encoding = fetched
+                    
+                    # Store content in the files hash and its packed metadata in the shards
+                    file_batch[file_content.path] = redis_content
+                    files_meta[file_content.path] = _pack_file_meta(
+                        content_encoding, len(redis_content), file_content.size or 0, STORAGE_INLINE, file_content.sha)
+                    
+                    files_stored += 1
+                    total_size += len(redis_content)
+                    
+                    if len(file_batch) >= FILE_BATCH_SIZE:
+                        self._flush_file_batch(pipe, files_key, file_batch)
+                    
+                    if files_stored % 10 == 0:
+                        print(f"📁 Processed {files_stored} files...")
+                    
+                except Exception as e:
+                    print(f"⚠️  Skipped file {file_content.path}: {str(e)}")
+                    continue
             
             # Update metadata with final counts
             metadata['total_files'] = files_stored
             metadata['total_size_bytes'] = total_size
             metadata['files_processed'] = files_processed
             
-            # Store metadata and structure in Redis
-            self.redis_client.hset(metadata_key, mapping=metadata)
-            self.redis_client.rpush(structure_key, *[json.dumps(item) for item in directory_structure])
+            # Store remaining files, metadata and structure in Redis
+            if file_batch:
+                pipe.hset(files_key, mapping=file_batch)
+            files_meta_keys = self._queue_files_meta(pipe, user_id, repo_name, files_meta)
+            metadata['files_meta_shards'] = len(files_meta_keys)
+            pipe.hset(metadata_key, mapping=metadata)
+            # The whole structure is written and read as one value
+            pipe.set(structure_key, _encode_json(directory_structure))
             
             # Add this repository to user's repository list
-            self.redis_client.sadd(user_repos_key, repo_name)
+            pipe.sadd(user_repos_key, repo_name)
             
             # Set expiration for user data (optional - 7 days default)
             expiration_days = 7
             expiration_seconds = expiration_days * 24 * 3600
-            self.redis_client.expire(files_key, expiration_seconds)
-            self.redis_client.expire(metadata_key, expiration_seconds)
-            self.redis_client.expire(structure_key, expiration_seconds)
-            self.redis_client.expire(user_repos_key, expiration_seconds)
+            pipe.expire(files_key, expiration_seconds)
+            for files_meta_key in files_meta_keys:
+                pipe.expire(files_meta_key, expiration_seconds)
+            pipe.expire(metadata_key, expiration_seconds)
+            pipe.expire(structure_key, expiration_seconds)
+            pipe.expire(user_repos_key, expiration_seconds)
+            pipe.execute()
             
             print(f"✅ Repository download completed!")
             print(f"📊 Statistics:")
@@ -483,6 +786,13 @@ class RedisRepoStorage:
             print(f"❌ Error downloading repository {repo_full_name}: {str(e)}")
             return False
 
+    def _get_repos_metadata(self, user_id: str, repo_names: List[str]) -> List[Dict[str, str]]:
+        """Fetch the metadata hash of every repository in one pipelined round-trip"""
+        pipe = self.redis_client.pipeline(transaction=False)
+        for repo_name in repo_names:
+            pipe.hgetall(self._get_repo_metadata_key(user_id, repo_name))
+        return pipe.execute()
+
     def get_user_repositories(self, user_identifier: str) -> List[Dict[str, Any]]:
         """
         Get all repositories stored in Redis for a specific user.
@@ -498,13 +808,10 @@ class RedisRepoStorage:
         
         try:
             # Get list of repository names for this user
-            repo_names = self.redis_client.smembers(user_repos_key)
+            repo_names = list(self.redis_client.smembers(user_repos_key))
             repositories = []
             
-            for repo_name in repo_names:
-                metadata_key = self._get_repo_metadata_key(user_id, repo_name)
-                metadata = self.redis_client.hgetall(metadata_key)
-                
+            for repo_name, metadata in zip(repo_names, self._get_repos_metadata(user_id, repo_names)):
                 if metadata:
                     # Convert metadata to proper types
                     repo_info = {
@@ -524,13 +831,17 @@ class RedisRepoStorage:
             print(f"❌ Error getting user repositories: {str(e)}")
             return []
 
-    def get_repository_files(self, user_identifier: str, repo_name: str) -> Dict[str, Any]:
+    def get_repository_files(self, user_identifier: str, repo_name: str,
+                             raw_content: bool = False) -> Dict[str, Any]:
         """
         Retrieve all files from a stored repository.
         
         Args:
             user_identifier: User identifier
             repo_name: Repository name (formatted for Redis)
+            raw_content: Return file content as bytes (the file's bytes, or UTF-8 for
+                text files) instead of text/base64, skipping the decode of every body;
+                legacy JSON envelopes still come back as text/base64
             
         Returns:
             Dictionary containing files and metadata
@@ -542,30 +853,80 @@ class RedisRepoStorage:
             metadata_key = self._get_repo_metadata_key(user_id, repo_name)
             structure_key = self._get_repo_structure_key(user_id, repo_name)
             
-            # Get metadata
-            metadata = self.redis_client.hgetall(metadata_key)
+            # Get metadata, structure and (unless raw bytes are wanted) inline file contents in one round-trip
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hgetall(metadata_key)
+            pipe.get(structure_key)
+            if not raw_content:
+                pipe.hgetall(files_key)
+            metadata, structure_json, *files_replies = pipe.execute(raise_on_error=False)
+            if isinstance(metadata, Exception):
+                raise metadata
             if not metadata:
                 return {'error': 'Repository not found'}
             
             # Get all files
-            files_data = self.redis_client.hgetall(files_key)
+            files_meta = self._get_files_meta(user_id, repo_name, int(metadata.get('files_meta_shards') or 0))
             files = {}
-            
-            for file_path, file_data_json in files_data.items():
-                try:
-                    file_data = json.loads(file_data_json)
+            blob_paths = []
+            blobs = None
+            
+            if raw_content:
+                # Inline contents and blobs come undecoded from the binary client in one round-trip
+                binary_pipe = self.binary_client.pipeline(transaction=False)
+                binary_pipe.hgetall(files_key)
+                binary_pipe.hgetall(self._get_repo_blobs_key(user_id, repo_name))
+                raw_files, blobs = binary_pipe.execute()
+                if _is_packed_meta(files_meta):
+                    files_data = {}
+                else:
+                    # JSON envelopes have to be parsed as text anyway
+                    files_data = {path.decode('utf-8'): value.decode('utf-8') for path, value in raw_files.items()}
+            else:
+                files_data, = files_replies
+                if isinstance(files_data, Exception):
+                    raise files_data
+            
+            if _is_packed_meta(files_meta):
+                # Metadata comes packed and inline content raw, so nothing needs JSON parsing
+                for file_path, file_meta in files_meta.items():
+                    file_data = _unpack_file_meta(file_path, file_meta)
                     files[file_path] = file_data
-                except json.JSONDecodeError:
-                    print(f"⚠️  Error decoding file data for: {file_path}")
-            
-            # Get directory structure
-            structure_items = self.redis_client.lrange(structure_key, 0, -1)
-            structure = []
-            for item in structure_items:
-                try:
-                    structure.append(json.loads(item))
-                except json.JSONDecodeError:
-                    continue
+                    if file_data.get('blob'):
+                        blob_paths.append(file_path)
+                    elif raw_content:
+                        content = raw_files.get(file_path.encode('utf-8'), b'')
+                        if file_data['encoding'] == 'base64':
+                            # Files downloaded from GitHub keep base64 text inline; hand back the file's bytes
+                            content = binascii.a2b_base64(content)
+                        elif file_data['encoding'] != 'utf-8':
+                            content = content.decode('utf-8')
+                        file_data['content'] = content
+                    else:
+                        file_data['content'] = files_data.get(file_path, '')
+            else:
+                # Older repositories keep a JSON envelope per file
+                for file_path, file_data_json in files_data.items():
+                    try:
+                        file_data = json.loads(file_data_json)
+                        files[file_path] = file_data
+                        if file_data.get('blob'):
+                            blob_paths.append(file_path)
+                    except json.JSONDecodeError:
+                        print(f"⚠️  Error decoding file data for: {file_path}")
+            
+            # Blob contents live in the blobs hash; hand them out as text or base64 as before
+            if blob_paths:
+                if blobs is None:
+                    blobs = self.binary_client.hgetall(self._get_repo_blobs_key(user_id, repo_name))
+                for file_path in blob_paths:
+                    self._hydrate_blob(files[file_path], blobs.get(file_path.encode('utf-8'), b''), raw_content)
+            
+            # Get directory structure; a legacy list structure fails the GET and is read separately
+            if isinstance(structure_json, Exception):
+                structure = self._load_structure(structure_key)
+            else:
+                structure = json.loads(structure_json) if structure_json else []
             
             return {
                 'metadata': metadata,
@@ -578,6 +939,138 @@ class RedisRepoStorage:
             print(f"❌ Error retrieving repository files: {str(e)}")
             return {'error': str(e)}
 
+    def _get_files_meta(self, user_id: str, repo_name: str, shards: Optional[int] = None) -> Dict[str, str]:
+        """All per-file metadata values of a repository, fetching every shard in one round-trip"""
+        if shards is None:
+            shards = self._get_files_meta_shards(user_id, repo_name)
+        if not shards:
+            # Repositories stored before sharding keep a single metadata hash
+            return self.redis_client.hgetall(self._get_repo_files_meta_key(user_id, repo_name))
+        
+        pipe = self.redis_client.pipeline(transaction=False)
+        for shard in range(shards):
+            pipe.hgetall(self._get_repo_files_meta_key(user_id, repo_name, shard))
+        meta_data = {}
+        for shard_data in pipe.execute():
+            meta_data.update(shard_data)
+        return meta_data
+
+    def _load_structure(self, structure_key: str) -> List[Dict[str, Any]]:
+        """Read a repository's directory structure with a single GET and parse"""
+        try:
+            structure_json = self.redis_client.get(structure_key)
+        except redis.ResponseError:
+            # Repositories stored before the single-key format keep a list of JSON entries
+            structure = []
+            for item in self.redis_client.lrange(structure_key, 0, -1):
+                try:
+                    structure.append(json.loads(item))
+                except json.JSONDecodeError:
+                    continue
+            return structure
+        return json.loads(structure_json) if structure_json else []
+
+    def _hydrate_blob(self, file_data: Dict[str, Any], blob: bytes, raw: bool = False):
+        """Fill in the content of a file whose bytes are stored in the blobs hash"""
+        if raw:
+            file_data['content'] = zlib.decompress(blob) if file_data.get('compression') == 'zlib' else blob
+        elif file_data.get('compression') == 'zlib':
+            file_data['content'] = zlib.decompress(blob).decode('utf-8')
+        else:
+            file_data['content'] = base64.b64encode(blob).decode('ascii')
+
+    def get_repository_metadata(self, user_identifier: str, repo_name: str) -> Dict[str, str]:
+        """
+        Retrieve only the metadata hash of a stored repository.
+        
+        Args:
+            user_identifier: User identifier
+            repo_name: Repository name (formatted for Redis)
+            
+        Returns:
+            Metadata dictionary (empty if the repository is not stored)
+        """
+        user_id = self._generate_user_id(user_identifier)
+        return self.redis_client.hgetall(self._get_repo_metadata_key(user_id, repo_name))
+
+    def list_files_metadata(self, user_identifier: str, repo_name: str) -> List[Tuple[str, int, str]]:
+        """
+        List (path, size, encoding) for every stored file without transferring file contents.
+        
+        Args:
+            user_identifier: User identifier
+            repo_name: Repository name (formatted for Redis)
+            
+        Returns:
+            List of (file path, stored size, encoding) tuples
+        """
+        user_id = self._generate_user_id(user_identifier)
+        
+        try:
+            meta_data = self._get_files_meta(user_id, repo_name)
+            if not meta_data:
+                # Repositories stored before the metadata hash existed only have the full files hash
+                meta_data = self.redis_client.hgetall(self._get_repo_files_key(user_id, repo_name))
+            
+            if _is_packed_meta(meta_data):
+                files = []
+                for file_path, file_meta in meta_data.items():
+                    encoding, size, _ = file_meta.split('|', 2)
+                    files.append((file_path, int(size), encoding))
+                return files
+            
+            files = []
+            for file_path, file_meta_json in meta_data.items():
+                try:
+                    file_meta = json.loads(file_meta_json)
+                    files.append((file_path, file_meta['size'], file_meta['encoding']))
+                except (json.JSONDecodeError, KeyError):
+                    print(f"⚠️  Error decoding file metadata for: {file_path}")
+            return files
+            
+        except Exception as e:
+            print(f"❌ Error listing file metadata: {str(e)}")
+            return []
+
+    def get_file(self, user_identifier: str, repo_name: str, file_path: str) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve a single stored file.
+        
+        Args:
+            user_identifier: User identifier
+            repo_name: Repository name (formatted for Redis)
+            file_path: Path of the file inside the repository
+            
+        Returns:
+            File data dictionary, or None if not found
+        """
+        user_id = self._generate_user_id(user_identifier)
+        files_key = self._get_repo_files_key(user_id, repo_name)
+        
+        # Packed metadata lives in the shard the path hashes to
+        shards = self._get_files_meta_shards(user_id, repo_name)
+        file_meta = None
+        if shards:
+            shard = zlib.crc32(file_path.encode('utf-8')) % shards
+            file_meta = self.redis_client.hget(self._get_repo_files_meta_key(user_id, repo_name, shard), file_path)
+        
+        if file_meta and not file_meta.startswith('{'):
+            file_data = _unpack_file_meta(file_path, file_meta)
+            if not file_data.get('blob'):
+                file_data['content'] = self.redis_client.hget(files_key, file_path) or ''
+                return file_data
+        else:
+            # Older repositories keep a JSON envelope per file
+            file_data_json = self.redis_client.hget(files_key, file_path)
+            if not file_data_json:
+                return None
+            file_data = json.loads(file_data_json)
+        
+        if file_data.get('blob'):
+            blob = self.binary_client.hget(self._get_repo_blobs_key(user_id, repo_name), file_path) or b''
+            self._hydrate_blob(file_data, blob)
+        return file_data
+
     def delete_user_repository(self, user_identifier: str, repo_name: str) -> bool:
         """
         Delete a specific repository for a user.
@@ -593,21 +1086,20 @@ class RedisRepoStorage:
         
         try:
             # Get Redis keys
-            files_key = self._get_repo_files_key(user_id, repo_name)
             metadata_key = self._get_repo_metadata_key(user_id, repo_name)
-            structure_key = self._get_repo_structure_key(user_id, repo_name)
             user_repos_key = self._get_user_repos_key(user_id)
+            data_keys = self._get_repo_data_keys(user_id, repo_name, self._get_files_meta_shards(user_id, repo_name))
             
             # Check if repository exists
             if not self.redis_client.exists(metadata_key):
                 print(f"⚠️  Repository {repo_name} not found for user")
                 return False
             
-            # Delete all repository data
-            deleted_keys = self.redis_client.delete(files_key, metadata_key, structure_key)
-            
-            # Remove from user's repository list
-            self.redis_client.srem(user_repos_key, repo_name)
+            # Delete all repository data and remove it from the user's list in one MULTI/EXEC
+            pipe = self.redis_client.pipeline()
+            pipe.unlink(*data_keys)
+            pipe.srem(user_repos_key, repo_name)
+            deleted_keys, _ = pipe.execute()
             
             print(f"✅ Repository {repo_name} deleted successfully")
             print(f"🗑️  Deleted {deleted_keys} Redis keys")
@@ -618,12 +1110,13 @@ class RedisRepoStorage:
             print(f"❌ Error deleting repository {repo_name}: {str(e)}")
             return False
 
-    def delete_all_user_data(self, user_identifier: str) -> bool:
+    def delete_all_user_data(self, user_identifier: str, pipe=None) -> bool:
         """
         Delete ALL data for a specific user (all repositories and metadata).
         
         Args:
             user_identifier: User identifier
+            pipe: Optional pipeline to queue the deletes on; the caller executes it
             
         Returns:
             True if successful, False otherwise
@@ -639,19 +1132,28 @@ class RedisRepoStorage:
                 print(f"ℹ️  No data found for user: {user_identifier}")
                 return True
             
-            # Delete each repository
-            total_deleted_keys = 0
+            # Look up every repository's metadata shard count in one round-trip
+            repo_names = list(repo_names)
+            shard_pipe = self.redis_client.pipeline(transaction=False)
             for repo_name in repo_names:
-                files_key = self._get_repo_files_key(user_id, repo_name)
-                metadata_key = self._get_repo_metadata_key(user_id, repo_name)
-                structure_key = self._get_repo_structure_key(user_id, repo_name)
-                
-                deleted_count = self.redis_client.delete(files_key, metadata_key, structure_key)
-                total_deleted_keys += deleted_count
+                shard_pipe.hget(self._get_repo_metadata_key(user_id, repo_name), 'files_meta_shards')
+            repo_shards = [int(shards or 0) for shards in shard_pipe.execute()]
+            
+            # Queue every repository's deletes so they go out in one round-trip
+            queued = pipe is not None
+            if not queued:
+                pipe = self.redis_client.pipeline(transaction=False)
+            for repo_name, shards in zip(repo_names, repo_shards):
+                pipe.unlink(*self._get_repo_data_keys(user_id, repo_name, shards))
             
             # Delete user's repository list
-            self.redis_client.delete(user_repos_key)
-            total_deleted_keys += 1
+            pipe.unlink(user_repos_key)
+            
+            if queued:
+                print(f"🗑️  Queued deletion of {len(repo_names)} repositories for user: {user_identifier}")
+                return True
+            
+            total_deleted_keys = sum(pipe.execute())
             
             print(f"✅ All data deleted for user: {user_identifier}")
             print(f"🗑️  Deleted {len(repo_names)} repositories")
@@ -678,16 +1180,13 @@ class RedisRepoStorage:
                 # User-specific statistics
                 user_id = self._generate_user_id(user_identifier)
                 user_repos_key = self._get_user_repos_key(user_id)
-                repo_names = self.redis_client.smembers(user_repos_key)
+                repo_names = list(self.redis_client.smembers(user_repos_key))
                 
                 total_files = 0
                 total_size = 0
                 repos_info = []
                 
-                for repo_name in repo_names:
-                    metadata_key = self._get_repo_metadata_key(user_id, repo_name)
-                    metadata = self.redis_client.hgetall(metadata_key)
-                    
+                for repo_name, metadata in zip(repo_names, self._get_repos_metadata(user_id, repo_names)):
                     if metadata:
                         repo_files = int(metadata.get('total_files', 0))
                         repo_size = int(metadata.get('total_size_bytes', 0))
@@ -712,17 +1211,20 @@ class RedisRepoStorage:
                     'repositories': repos_info
                 }
             else:
-                # System-wide statistics
-                all_keys = self.redis_client.keys("user:*")
+                # System-wide statistics; SCAN walks the keyspace in steps instead of
+                # blocking the server the way KEYS does
                 user_keys = set()
+                total_keys = 0
                 
-                for key in all_keys:
-                    if ':repos:list' in key:
-                        user_keys.add(key.split(':')[1])
+                for key in self.redis_client.scan_iter(match="user:*", count=SCAN_COUNT):
+                    total_keys += 1
+                    if key.endswith(':repos:list'):
+                        # 'user:{user_id}:...' -> user_id without building a list of every segment
+                        user_keys.add(key.partition(':')[2].partition(':')[0])
                 
                 return {
                     'total_users': len(user_keys),
-                    'total_redis_keys': len(all_keys),
+                    'total_redis_keys': total_keys,
                     'redis_memory_usage': self.redis_client.info('memory')
                 }
                 
@@ -746,8 +1248,8 @@ class RedisRepoStorage:
         user_id = self._generate_user_id(user_identifier)
         
         try:
-            # Get repository data from Redis
-            repo_data = self.get_repository_files(user_identifier, repo_name)
+            # Get repository data from Redis; contents stay bytes so they are written as stored
+            repo_data = self.get_repository_files(user_identifier, repo_name, raw_content=True)
             
             if 'error' in repo_data:
                 print(f"❌ Repository not found in Redis: {repo_name}")
@@ -757,41 +1259,50 @@ class RedisRepoStorage:
             print(f"📁 Export path: {export_path}")
             
             # Create export directory
-            if not os.path.exists(export_path):
-                os.makedirs(export_path)
+            os.makedirs(export_path, exist_ok=True)
             
             files_exported = 0
             
-            # Export all files
-            for file_path, file_data in repo_data['files'].items():
+            # Write files grouped by directory, so consecutive writes land in the same directory
+            files = repo_data['files']
+            file_paths = sorted(files, key=lambda file_path: (file_path.rpartition('/')[0], file_path))
+            
+            # Create every parent directory once up front instead of checking per file
+            local_dirs = {os.path.dirname(os.path.join(export_path, file_path)) for file_path in file_paths}
+            for local_dir in sorted(local_dirs):
                 try:
-                    # Create local file path
-                    local_file_path = os.path.join(export_path, file_path)
-                    
-                    # Create directory if needed
-                    local_dir = os.path.dirname(local_file_path)
-                    if local_dir and not os.path.exists(local_dir):
-                        os.makedirs(local_dir)
-                    
-                    # Write file content based on encoding
-                    if file_data['encoding'] == 'base64':
-                        # Decode base64 and write binary
-                        decoded_content = base64.b64decode(file_data['content'])
-                        with open(local_file_path, 'wb') as f:
-                            f.write(decoded_content)
-                    else:
-                        # Write text content
-                        with open(local_file_path, 'w', encoding='utf-8') as f:
-                            f.write(file_data['content'])
-                    
-                    files_exported += 1
-                    
-                    if files_exported % 10 == 0:
-                        print(f"📁 Exported {files_exported} files...")
-                    
-                except Exception as e:
-                    print(f"⚠️  Error exporting file {file_path}: {str(e)}")
-                    continue
+                    os.makedirs(local_dir, exist_ok=True)
+                except OSError as e:
+                    print(f"⚠️  Error creating directory {local_dir}: {str(e)}")
+            
+            # Bucket files by how their content is written, deciding each file's encoding once
+            buckets = {_write_bytes_file: [], _write_base64_file: [], _write_text_file: []}
+            for file_path in file_paths:
+                file_data = files[file_path]
+                if file_data['encoding'] == 'base64' and not isinstance(file_data['content'], bytes):
+                    # Content still in base64 text form
+                    buckets[_write_base64_file].append(file_path)
+                elif isinstance(file_data['content'], bytes):
+                    # The file's own bytes need no decoding
+                    buckets[_write_bytes_file].append(file_path)
+                else:
+                    buckets[_write_text_file].append(file_path)
+            
+            # Export all files; writes block in the kernel, so a pool overlaps them across files
+            with ThreadPoolExecutor(max_workers=WRITE_WORKERS) as executor:
+                for write_file, bucket_paths in buckets.items():
+                    results = executor.map(write_file,
+                                           [os.path.join(export_path, file_path) for file_path in bucket_paths],
+                                           [files[file_path]['content'] for file_path in bucket_paths])
+                    for file_path, error in zip(bucket_paths, results):
+                        if error is not None:
+                            print(f"⚠️  Error exporting file {file_path}: {str(error)}")
+                            continue
+                        
+                        files_exported += 1
+                        
+                        if files_exported % 10 == 0:
+                            print(f"📁 Exported {files_exported} files...")
             
             print(f"✅ Export completed!")
             print(f"📊 Statistics:")
@@ -805,13 +1316,19 @@ class RedisRepoStorage:
             return False
 
 
+@lru_cache(maxsize=1)
+def get_storage() -> RedisRepoStorage:
+    """Process-wide storage client, so scripts pay the Redis Cloud handshake once"""
+    return RedisRepoStorage()
+
+
 # Core functionality - simplified and focused (Redis Cloud)
 def download_and_store_from_ingestion(user_email: str = "user@example.com", 
                                     repo_name: str = "shivansh-2003/memo"):
     """
     Main function: Download repo using ingestion.py and store in Redis Cloud.
     """
-    storage = RedisRepoStorage()  # Uses Redis Cloud by default
+    storage = get_storage()  # Shared Redis Cloud client
     
     print(f"🚀 Starting download and Redis Cloud storage for {repo_name}")
     print(f"☁️  Using Redis Cloud database: database-MC4IJX56")
@@ -837,7 +1354,7 @@ def store_existing_download(user_email: str = "user@example.com",
     """
     Store a repository that was already downloaded by ingestion.py to Redis Cloud
     """
-    storage = RedisRepoStorage()  # Uses Redis Cloud by default
+    storage = get_storage()  # Shared Redis Cloud client
     
     print(f"☁️  Storing to Redis Cloud database: database-MC4IJX56")
     return storage.store_local_repo_to_redis(
@@ -850,7 +1367,7 @@ def get_user_repos(user_email: str = "user@example.com"):
     """
     Get all repositories stored for a user from Redis Cloud
     """
-    storage = RedisRepoStorage()  # Uses Redis Cloud by default
+    storage = get_storage()  # Shared Redis Cloud client
     return storage.get_user_repositories(user_email)
 
 def example_usage():
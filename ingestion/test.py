@@ -6,12 +6,13 @@ ingestion.py (download) -> redis.py (store in Redis Cloud)
 
 import os
 import sys
+import base64
 from github import Github
 from dotenv import load_dotenv
 
 # Import directly since we're in the ingestion directory
 from ingestion import download_repo_contents
-from redis_imple import RedisRepoStorage
+from redis_imple import get_storage, _walk_scandir, _pack_file_meta, STORAGE_INLINE
 
 load_dotenv()
 
@@ -44,7 +45,7 @@ def test_pipeline():
         
         # Verify download worked
         if os.path.exists(local_path):
-            file_count = sum([len(files) for r, d, files in os.walk(local_path)])
+            file_count = sum(len(files) for _, _, files in _walk_scandir(local_path))
             print(f"✅ Download successful: {file_count} files downloaded to {local_path}")
         else:
             print("❌ Download failed: local path doesn't exist")
@@ -52,7 +53,7 @@ def test_pipeline():
         
         # Step 3: Test Redis storage
         print("\n3️⃣ Testing Redis Cloud storage...")
-        storage = RedisRepoStorage()
+        storage = get_storage()
         
         success = storage.store_local_repo_to_redis(
             user_identifier=user_email,
@@ -114,7 +115,7 @@ def test_quick():
     print("=" * 50)
     
     try:
-        storage = RedisRepoStorage()
+        storage = get_storage()
         success = storage.download_and_store_repo_integrated(
             user_identifier="quicktest@example.com",
             repo_full_name="shivansh-2003/memo",
@@ -143,6 +144,59 @@ def test_quick():
             import shutil
             shutil.rmtree("./quick_test_repo")
 
+def test_export_base64_roundtrip():
+    """Export a base64 file stored inline (as GitHub downloads are) and check the bytes on disk"""
+    print("\n🔁 Export Test: Inline base64 file round-trip")
+    print("=" * 50)
+    
+    user_email = "exporttest@example.com"
+    repo_name = "export_roundtrip_test"
+    export_path = "./export_roundtrip_repo"
+    file_path = "assets/logo.png"
+    payload = b'\x89PNG\r\n\x1a\n' + bytes(range(256)) * 64
+    
+    storage = get_storage()
+    try:
+        # Store the file the way download_repository_to_redis does: base64 text inline, packed metadata
+        user_id = storage._generate_user_id(user_email)
+        encoded = base64.b64encode(payload).decode('utf-8')
+        pipe = storage.redis_client.pipeline(transaction=False)
+        pipe.hset(storage._get_repo_files_key(user_id, repo_name), file_path, encoded)
+        files_meta = {file_path: _pack_file_meta('base64', len(encoded), len(payload), STORAGE_INLINE, 'test-sha')}
+        shard_keys = storage._queue_files_meta(pipe, user_id, repo_name, files_meta)
+        pipe.hset(storage._get_repo_metadata_key(user_id, repo_name), mapping={
+            'repo_full_name': repo_name,
+            'total_files': 1,
+            'files_meta_shards': len(shard_keys)
+        })
+        pipe.sadd(storage._get_user_repos_key(user_id), repo_name)
+        pipe.execute()
+        
+        if not storage.export_repo_from_redis_to_local(user_email, repo_name, export_path):
+            print("❌ Export failed")
+            return False
+        
+        with open(os.path.join(export_path, file_path), 'rb') as f:
+            exported = f.read()
+        
+        if exported != payload:
+            print(f"❌ Exported bytes differ: {len(exported)} bytes written, {len(payload)} expected")
+            return False
+        
+        print("✅ Export test passed!")
+        return True
+        
+    except Exception as e:
+        print(f"❌ Export test error: {str(e)}")
+        return False
+    
+    finally:
+        # Cleanup
+        storage.delete_user_repository(user_email, repo_name)
+        if os.path.exists(export_path):
+            import shutil
+            shutil.rmtree(export_path)
+
 if __name__ == "__main__":
     print("🔬 GitHub -> Redis Pipeline Tests")
     print("Make sure you have GITHUB_ACCESS_TOKEN in your .env file\n")
@@ -153,11 +207,15 @@ if __name__ == "__main__":
     # Run quick integrated test
     quick_success = test_quick()
     
+    # Run export round-trip test
+    export_success = test_export_base64_roundtrip()
+    
     print("\n📊 Test Results:")
     print(f"Step-by-step test: {'✅ PASS' if step_by_step_success else '❌ FAIL'}")
     print(f"Quick test: {'✅ PASS' if quick_success else '❌ FAIL'}")
+    print(f"Export test: {'✅ PASS' if export_success else '❌ FAIL'}")
     
-    if step_by_step_success and quick_success:
+    if step_by_step_success and quick_success and export_success:
         print("\n🎉 All tests passed! Your pipeline is working perfectly.")
     else:
         print("\n❌ Some tests failed. Check the error messages above.") 
\ No newline at end of file